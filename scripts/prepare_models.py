@@ -1,9 +1,14 @@
+import asyncio
 import os
-import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import requests
 from tqdm import tqdm
 
+CHUNK_SIZE = 8 * 1024 * 1024
+DOWNLOAD_WORKERS = 8
+
 MODELS = {
     'codellama-7b': {
         'url': 'https://huggingface.co/codellama/CodeLlama-7b-Instruct-hf/resolve/main/model.safetensors',
@@ -16,54 +21,139 @@ MODELS = {
 }
 
 def download_file(url: str, output: str):
-    """Download file with progress bar"""
-    response = requests.get(url, stream=True)
-    total_size = int(response.headers.get('content-length', 0))
+    """Download file with progress bar, using parallel range requests when supported"""
+    head = requests.head(url, allow_redirects=True)
+    total_size = int(head.headers.get('content-length', 0))
     
     os.makedirs(os.path.dirname(output), exist_ok=True)
     
-    with open(output, 'wb') as f, tqdm(
+    with tqdm(
         desc=os.path.basename(output),
         total=total_size,
         unit='iB',
         unit_scale=True
     ) as pbar:
-        for data in response.iter_content(chunk_size=1024):
-            size = f.write(data)
-            pbar.update(size)
+        if total_size and head.headers.get('accept-ranges') == 'bytes':
+            _download_ranges(head.url, output, total_size, pbar)
+        else:
+            _download_stream(url, output, pbar)
 
-def quantize_model(input_path: str, output_path: str):
-    """Quantize model for EdgeTPU"""
+def _download_stream(url: str, output: str, pbar: tqdm):
+    """Download file over a single connection"""
+    response = requests.get(url, stream=True)
+    response.raise_for_status()
+    
+    fd = os.open(output, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
     try:
-        subprocess.run([
-            'edgetpu_compiler',
-            '--input_model', input_path,
-            '--output_model', output_path,
-            '--quantization_steps', '256'
-        ], check=True)
-    except subprocess.CalledProcessError as e:
-        print(f"Error quantizing model: {e}")
-        raise
+        _copy_to_fd(response, fd, 0, pbar.update)
+    finally:
+        os.close(fd)
 
-def main():
+def _copy_to_fd(response: requests.Response, fd: int, offset: int, progress):
+    """Read the response body into one reused buffer and write it at offset"""
+    response.raw.decode_content = True
+    buffer = bytearray(CHUNK_SIZE)
+    view = memoryview(buffer)
+    
+    while True:
+        size = response.raw.readinto(buffer)
+        if not size:
+            break
+        written = 0
+        while written < size:
+            written += os.pwrite(fd, view[written:size], offset + written)
+        offset += size
+        progress(size)
+
+def _download_ranges(url: str, output: str, total_size: int, pbar: tqdm):
+    """Download byte ranges concurrently, writing each into its slice of the file"""
+    lock = threading.Lock()
+    step = -(-total_size // DOWNLOAD_WORKERS)
+    ranges = [
+        (lo, min(lo + step, total_size) - 1)
+        for lo in range(0, total_size, step)
+    ]
+    
+    fd = os.open(output, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        if hasattr(os, 'posix_fallocate'):
+            os.posix_fallocate(fd, 0, total_size)
+        else:
+            os.ftruncate(fd, total_size)
+            
+        def fetch(lo: int, hi: int):
+            response = requests.get(url, headers={'Range': f'bytes={lo}-{hi}'}, stream=True)
+            response.raise_for_status()
+            if response.status_code != 206:
+                raise RuntimeError(f"Server ignored range request for {url}")
+                
+            def progress(size: int):
+                with lock:
+                    pbar.update(size)
+                    
+            _copy_to_fd(response, fd, lo, progress)
+            
+        with ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS) as pool:
+            futures = [pool.submit(fetch, lo, hi) for lo, hi in ranges]
+            for future in futures:
+                future.result()
+    finally:
+        os.close(fd)
+
+async def quantize_model(input_path: str, output_path: str):
+    """Quantize model for EdgeTPU"""
+    process = await asyncio.create_subprocess_exec(
+        'edgetpu_compiler',
+        '--input_model', input_path,
+        '--output_model', output_path,
+        '--quantization_steps', '256'
+    )
+    returncode = await process.wait()
+    if returncode != 0:
+        print(f"Error quantizing model: edgetpu_compiler exited with {returncode}")
+        raise RuntimeError(f"edgetpu_compiler failed for {input_path}")
+
+async def main():
     print("Preparing models for deployment...")
     
-    for model_name, model_info in MODELS.items():
-        print(f"\nProcessing {model_name}...")
-        
-        # Download model if not exists
-        if not os.path.exists(model_info['output']):
-            temp_path = f"models/temp_{model_name}.safetensors"
-            download_file(model_info['url'], temp_path)
+    # Downloads feed the quantizer so the next download overlaps compilation
+    quantize_q: asyncio.Queue = asyncio.Queue()
+    
+    async def producer():
+        try:
+            for model_name, model_info in MODELS.items():
+                print(f"\nProcessing {model_name}...")
+                
+                # Download model if not exists
+                if os.path.exists(model_info['output']):
+                    print(f"{model_name} ready!")
+                    continue
+                    
+                temp_path = f"models/temp_{model_name}.safetensors"
+                await asyncio.to_thread(download_file, model_info['url'], temp_path)
+                await quantize_q.put((model_name, model_info, temp_path))
+        finally:
+            await quantize_q.put(None)
+            
+    async def consumer():
+        while True:
+            item = await quantize_q.get()
+            if item is None:
+                break
+                
+            model_name, model_info, temp_path = item
             
             # Convert and quantize
             print(f"Quantizing {model_name}...")
-            quantize_model(temp_path, model_info['output'])
-            
-            # Cleanup
-            os.remove(temp_path)
+            try:
+                await quantize_model(temp_path, model_info['output'])
+            finally:
+                # Cleanup
+                os.remove(temp_path)
+                
+            print(f"{model_name} ready!")
             
-        print(f"{model_name} ready!")
+    await asyncio.gather(producer(), consumer())
 
 if __name__ == '__main__':
-    main() 
\ No newline at end of file
+    asyncio.run(main())
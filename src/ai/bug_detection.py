@@ -1,14 +1,87 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
+from collections import OrderedDict
 import ast
 import asyncio
+import bisect
+import functools
+import hashlib
+import re
+import sys
 from pathlib import Path
 
 from ..core.base_models import BaseModel, ModelConfig
 from ..monitoring.metrics import MetricsTracker
+from .inference_worker import InferenceWorker
 from .code_analyzer import CodeAnalyzer, CodeMetrics
 
-@dataclass
+# Regex-detectable bug patterns per language
+_BUG_PATTERNS: Dict[str, List[Dict[str, Any]]] = {
+    'python': [
+        {
+            'type': 'none_comparison',
+            'severity': 'low',
+            'description': 'Comparison to None using an equality operator',
+            'regex': r'[=!]=\s*None\b',
+            'fix_template': 'Use "is None" or "is not None" instead of "{text}"',
+            'confidence': 0.9
+        },
+        {
+            'type': 'mutable_default_argument',
+            'severity': 'medium',
+            'description': 'Mutable default argument',
+            'regex': r'\bdef\s+\w+\s*\([^)]*=\s*(?:\[\s*\]|\{\s*\}|set\(\s*\))',
+            'fix_template': 'Default to None and create the object inside the function',
+            'confidence': 0.85
+        },
+        {
+            'type': 'eval_usage',
+            'severity': 'high',
+            'description': 'Use of eval() on dynamic input',
+            'regex': r'(?<![\w.])eval\s*\(',
+            'fix_template': 'Replace eval() with ast.literal_eval() or explicit parsing',
+            'confidence': 0.7
+        },
+        {
+            'type': 'hardcoded_secret',
+            'severity': 'high',
+            'description': 'Hardcoded credential',
+            'regex': r'\b(?:password|passwd|secret|api_key|token)\s*=\s*[\'"][^\'"]+[\'"]',
+            'fix_template': 'Load the value from configuration or the environment',
+            'confidence': 0.6
+        }
+    ]
+}
+
+# Calls that return a resource which must be closed
+OPEN_NAMES = frozenset({'open', 'io.open', 'codecs.open'})
+
+# Context managers that take over closing the resource passed to them
+CLOSING_NAMES = frozenset({'closing', 'contextlib.closing'})
+
+_SEVERITY_WEIGHTS = {
+    sys.intern(severity): weight
+    for severity, weight in (('critical', 4), ('high', 3), ('medium', 2), ('low', 1))
+}
+
+@functools.cache
+def _get_pattern_db(language: str) -> Tuple[Optional[re.Pattern], List[Tuple[re.Pattern, Dict[str, Any]]]]:
+    """Compile a language's patterns, once per process.
+    
+    Returns an alternation of every pattern, used to find where any of them
+    match, and each pattern compiled on its own to test at those offsets.
+    """
+    patterns = [
+        {**pattern, 'severity': sys.intern(pattern['severity']), 'type': sys.intern(pattern['type'])}
+        for pattern in _BUG_PATTERNS.get(language, [])
+    ]
+    if not patterns:
+        return None, []
+        
+    combined = re.compile('|'.join(f'(?:{pattern["regex"]})' for pattern in patterns))
+    return combined, [(re.compile(pattern['regex']), pattern) for pattern in patterns]
+
+@dataclass(slots=True, frozen=True)
 class BugReport:
     severity: str  # 'critical', 'high', 'medium', 'low'
     bug_type: str
@@ -17,12 +90,53 @@ class BugReport:
     suggested_fix: Optional[str]
     confidence: float
     context: Dict[str, Any]
+    
+    def __post_init__(self):
+        # Interned values share storage and hit the severity lookup by identity
+        object.__setattr__(self, 'severity', sys.intern(self.severity))
+        object.__setattr__(self, 'bug_type', sys.intern(self.bug_type))
+
+class _BugVisitor(ast.NodeVisitor):
+    """Runs every static check in a single pass over the tree"""
+    
+    def __init__(self, detector: 'BugDetector'):
+        self.detector = detector
+        self.bugs: List[BugReport] = []
+        self._managed = set()  # ids of calls used as with-item context managers
+        
+    def visit_ExceptHandler(self, node: ast.ExceptHandler):
+        self.bugs.extend(self.detector._check_exception_handling(node))
+        self.generic_visit(node)
+        
+    def visit_With(self, node: ast.With):
+        self._managed.update(id(item.context_expr) for item in node.items)
+        self.generic_visit(node)
+        
+    visit_AsyncWith = visit_With
+    
+    def visit_Call(self, node: ast.Call):
+        managed = id(node) in self._managed
+        if (managed and self._is_closing(node)) or self._is_enter_context(node):
+            # Wrapped resources, as in closing(open(...)), are managed by their parent
+            self._managed.update(id(arg) for arg in node.args)
+        elif not managed:
+            self.bugs.extend(self.detector._check_resource_management(node))
+        self.generic_visit(node)
+        
+    def _is_closing(self, node: ast.Call) -> bool:
+        return self.detector._get_call_name(node.func) in CLOSING_NAMES
+        
+    def _is_enter_context(self, node: ast.Call) -> bool:
+        return isinstance(node.func, ast.Attribute) and node.func.attr == 'enter_context'
 
 class BugDetector:
     def __init__(self, model_config: Optional[ModelConfig] = None):
         self.model = BaseModel(model_config) if model_config else None
+        self.inference = InferenceWorker.for_model(self.model) if self.model else None
         self.analyzer = CodeAnalyzer()
         self.metrics = MetricsTracker()
+        self._static_cache: OrderedDict = OrderedDict()
+        self._static_cache_size = 512
         
     async def scan_code(self, 
                        code: str, 
@@ -30,20 +144,20 @@ class BugDetector:
                        context: Optional[Dict[str, Any]] = None) -> List[BugReport]:
         """Scan code for potential bugs"""
         try:
-            bugs = []
-            
-            # Static analysis
-            static_bugs = await self._static_analysis(code, language)
-            bugs.extend(static_bugs)
-            
-            # Pattern-based detection
-            pattern_bugs = await self._pattern_analysis(code, language)
-            bugs.extend(pattern_bugs)
-            
-            # Model-based detection
+            # Static, pattern-based and model-based detection are independent
+            analyses = [
+                self._static_analysis(code, language),
+                self._pattern_analysis(code, language)
+            ]
             if self.model:
-                model_bugs = await self._model_analysis(code, language, context)
-                bugs.extend(model_bugs)
+                analyses.append(self._model_analysis(code, language, context))
+                
+            bugs = []
+            for result in await asyncio.gather(*analyses, return_exceptions=True):
+                if isinstance(result, Exception):
+                    self.metrics.record_error('bug_detection_error', str(result))
+                    continue
+                bugs.extend(result)
                 
             # Deduplicate and rank bugs
             return self._prioritize_bugs(bugs)
@@ -54,17 +168,32 @@ class BugDetector:
             
     async def _static_analysis(self, code: str, language: str) -> List[BugReport]:
         """Perform static code analysis"""
+        cache_key = self._static_cache_key(code, language)
+        if cache_key in self._static_cache:
+            self._static_cache.move_to_end(cache_key)
+            return list(self._static_cache[cache_key])
+            
+        # Parsing and visiting are CPU-bound, keep them off the event loop
+        bugs = await asyncio.to_thread(self._run_static_checks, code, language)
+        
+        self._static_cache[cache_key] = bugs
+        if len(self._static_cache) > self._static_cache_size:
+            self._static_cache.popitem(last=False)
+            
+        return list(bugs)
+        
+    def _run_static_checks(self, code: str, language: str) -> List[BugReport]:
+        """Run the static checks for a language"""
         bugs = []
         
         if language == 'python':
             try:
                 tree = ast.parse(code)
                 
-                # Check for common issues
-                bugs.extend(self._check_exception_handling(tree))
-                bugs.extend(self._check_resource_management(tree))
-                bugs.extend(self._check_null_references(tree))
-                bugs.extend(self._check_type_safety(tree))
+                # Check for common issues in one traversal
+                visitor = _BugVisitor(self)
+                visitor.visit(tree)
+                bugs.extend(visitor.bugs)
                 
             except SyntaxError as e:
                 bugs.append(BugReport(
@@ -79,14 +208,43 @@ class BugDetector:
                 
         return bugs
         
+    def _static_cache_key(self, code: str, language: str) -> Tuple[bytes, str]:
+        """Build the memoization key for static analysis results"""
+        return hashlib.blake2b(code.encode(), digest_size=16).digest(), language
+        
     async def _pattern_analysis(self, code: str, language: str) -> List[BugReport]:
         """Detect bugs using known patterns"""
-        patterns = self._load_bug_patterns(language)
+        return await asyncio.to_thread(self._scan_patterns, code, language)
+        
+    def _scan_patterns(self, code: str, language: str) -> List[BugReport]:
+        """Scan code for every known pattern of a language"""
+        combined, patterns = _get_pattern_db(language)
+        if combined is None:
+            return []
+            
         bugs = []
+        line_starts = None
+        # End of each pattern's last match; like finditer, its matches don't overlap
+        last_end = [0] * len(patterns)
         
-        for pattern in patterns:
-            matches = pattern['detector'](code)
-            for match in matches:
+        # The alternation finds each offset where some pattern matches; resuming
+        # one character later keeps findings that start inside an earlier match
+        pos = 0
+        while (found := combined.search(code, pos)) is not None:
+            start = found.start()
+            for i, (regex, pattern) in enumerate(patterns):
+                if start < last_end[i]:
+                    continue
+                m = regex.match(code, start)
+                if m is None:
+                    continue
+                last_end[i] = max(m.end(), start + 1)
+                if line_starts is None:
+                    line_starts = self._line_starts(code)
+                match = {
+                    'text': m.group(),
+                    'location': self._get_offset_location(line_starts, m.start(), m.end())
+                }
                 bugs.append(BugReport(
                     severity=pattern['severity'],
                     bug_type=pattern['type'],
@@ -96,9 +254,32 @@ class BugDetector:
                     confidence=pattern['confidence'],
                     context={'match': match}
                 ))
+            pos = start + 1
                 
         return bugs
         
+    def _load_bug_patterns(self, language: str) -> List[Dict[str, Any]]:
+        """Load bug patterns for a language"""
+        return [pattern for _, pattern in _get_pattern_db(language)[1]]
+        
+    def _line_starts(self, code: str) -> List[int]:
+        """Get the offset at which each line of code starts"""
+        return [0] + [m.end() for m in re.finditer('\n', code)]
+        
+    def _get_offset_location(self, 
+                            line_starts: List[int], 
+                            start: int, 
+                            end: int) -> Dict[str, Any]:
+        """Convert character offsets into a location like _get_node_location"""
+        line = bisect.bisect_right(line_starts, start)
+        end_line = bisect.bisect_right(line_starts, end)
+        return {
+            'line': line,
+            'column': start - line_starts[line - 1],
+            'end_line': end_line,
+            'end_column': end - line_starts[end_line - 1]
+        }
+        
     async def _model_analysis(self, 
                             code: str, 
                             language: str,
@@ -111,63 +292,57 @@ class BugDetector:
         model_input = self._prepare_model_input(code, language, context)
         
         # Get model predictions
-        predictions = await self.model.infer(model_input)
+        predictions = await self.inference.submit(model_input)
         
         # Process predictions into bug reports
         return self._process_model_predictions(predictions, code)
         
-    def _check_exception_handling(self, tree: ast.AST) -> List[BugReport]:
-        """Check for exception handling issues"""
+    def _check_exception_handling(self, node: ast.ExceptHandler) -> List[BugReport]:
+        """Check an except clause for exception handling issues"""
         bugs = []
         
-        for node in ast.walk(tree):
-            # Check for bare except clauses
-            if isinstance(node, ast.ExceptHandler) and node.type is None:
-                bugs.append(BugReport(
-                    severity='medium',
-                    bug_type='bare_except',
-                    description='Bare except clause found',
-                    location=self._get_node_location(node),
-                    suggested_fix='Specify exception type(s) to catch',
-                    confidence=0.9,
-                    context={'node': node}
-                ))
-                
-            # Check for pass in except blocks
-            if (isinstance(node, ast.ExceptHandler) and 
-                any(isinstance(n, ast.Pass) for n in node.body)):
-                bugs.append(BugReport(
-                    severity='medium',
-                    bug_type='pass_in_except',
-                    description='Pass statement in except block',
-                    location=self._get_node_location(node),
-                    suggested_fix='Handle or log the exception appropriately',
-                    confidence=0.8,
-                    context={'node': node}
-                ))
-                
+        # Check for bare except clauses
+        if node.type is None:
+            bugs.append(BugReport(
+                severity='medium',
+                bug_type='bare_except',
+                description='Bare except clause found',
+                location=self._get_node_location(node),
+                suggested_fix='Specify exception type(s) to catch',
+                confidence=0.9,
+                context={'node': node}
+            ))
+            
+        # Check for pass in except blocks
+        if any(isinstance(n, ast.Pass) for n in node.body):
+            bugs.append(BugReport(
+                severity='medium',
+                bug_type='pass_in_except',
+                description='Pass statement in except block',
+                location=self._get_node_location(node),
+                suggested_fix='Handle or log the exception appropriately',
+                confidence=0.8,
+                context={'node': node}
+            ))
+            
         return bugs
         
-    def _check_resource_management(self, tree: ast.AST) -> List[BugReport]:
-        """Check for resource management issues"""
+    def _check_resource_management(self, node: ast.Call) -> List[BugReport]:
+        """Check a call made outside a with statement for resource leaks"""
         bugs = []
         
-        for node in ast.walk(tree):
-            # Check for file operations without context manager
-            if (isinstance(node, ast.Call) and 
-                isinstance(node.func, ast.Name) and
-                node.func.id == 'open'):
-                if not self._is_in_with_context(node):
-                    bugs.append(BugReport(
-                        severity='high',
-                        bug_type='resource_leak',
-                        description='File opened without context manager',
-                        location=self._get_node_location(node),
-                        suggested_fix='Use "with open(...) as f:" pattern',
-                        confidence=0.9,
-                        context={'node': node}
-                    ))
-                    
+        # Check for file operations without context manager
+        if self._get_call_name(node.func) in OPEN_NAMES:
+            bugs.append(BugReport(
+                severity='high',
+                bug_type='resource_leak',
+                description='File opened without context manager',
+                location=self._get_node_location(node),
+                suggested_fix='Use "with open(...) as f:" pattern',
+                confidence=0.9,
+                context={'node': node}
+            ))
+            
         return bugs
         
     def _prioritize_bugs(self, bugs: List[BugReport]) -> List[BugReport]:
@@ -176,19 +351,30 @@ class BugDetector:
         unique_bugs = self._remove_duplicates(bugs)
         
         # Sort by severity and confidence
-        severity_weights = {
-            'critical': 4,
-            'high': 3,
-            'medium': 2,
-            'low': 1
-        }
+        severity_weight = _SEVERITY_WEIGHTS.__getitem__
         
         return sorted(
             unique_bugs,
-            key=lambda x: (severity_weights[x.severity], x.confidence),
+            key=lambda x: (severity_weight(x.severity), x.confidence),
             reverse=True
         )
         
+    def _remove_duplicates(self, bugs: List[BugReport]) -> List[BugReport]:
+        """Keep the first report for each bug type, location and severity"""
+        seen = {}
+        for bug in bugs:
+            key = (bug.bug_type, bug.location.get('line'), bug.location.get('column'), bug.severity)
+            seen.setdefault(key, bug)
+        return list(seen.values())
+        
+    def _get_call_name(self, func: ast.expr) -> Optional[str]:
+        """Get the dotted name of a called function, e.g. 'io.open'"""
+        if isinstance(func, ast.Name):
+            return func.id
+        if isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name):
+            return f'{func.value.id}.{func.attr}'
+        return None
+        
     def _get_node_location(self, node: ast.AST) -> Dict[str, Any]:
         """Get location information for an AST node"""
         return {
@@ -1,12 +1,22 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
+from collections import OrderedDict
 import asyncio
+import hashlib
+import logging
+import time
 from pathlib import Path
+import numpy as np
 
 from ..core.base_models import BaseModel, ModelConfig
-from ..monitoring.metrics import MetricsTracker
+from ..monitoring.metrics import MetricsTracker, RingMetrics, register_metric
+from .inference_worker import InferenceWorker
 
-@dataclass
+logger = logging.getLogger(__name__)
+
+COMPLETION_TIME = register_metric('completion_time')
+
+@dataclass(slots=True, frozen=True)
 class CompletionSuggestion:
     code: str
     confidence: float
@@ -16,8 +26,19 @@ class CompletionSuggestion:
 class CodeCompletion:
     def __init__(self, model_config: Optional[ModelConfig] = None):
         self.model = BaseModel(model_config) if model_config else None
+        self.inference = InferenceWorker.for_model(self.model) if self.model else None
         self.metrics = MetricsTracker()
+        self.timings = RingMetrics(self.metrics)
         self.context_window = 1000  # Characters of context to consider
+        self.cache_size = 1024
+        self.similarity_threshold = 0.95
+        self._exact_cache: OrderedDict = OrderedDict()
+        # Semantic tier: one embedding row per entry, so a lookup is one matrix-vector product
+        self._semantic_vectors: Optional[np.ndarray] = None
+        self._semantic_entries: List[Tuple[Dict[str, Any], List[CompletionSuggestion]]] = []
+        self._semantic_used: Optional[np.ndarray] = None  # Last use tick per row, for LRU eviction
+        self._semantic_tick = 0
+        self._embedder_task: Optional[asyncio.Task] = None
         
     async def get_suggestions(self, 
                             code: str, 
@@ -29,13 +50,23 @@ class CodeCompletion:
             # Extract context around cursor
             context = self._extract_context(code, cursor_position)
             
+            # Serve near-identical contexts without invoking the model
+            cache_key = self._cache_key(context, language)
+            cached = self._get_exact(cache_key)
+            if cached is None:
+                embedding = await self._embed(context['before'][-256:])
+                cached = self._get_similar(embedding, context)
+            if cached is not None:
+                return cached[:max_suggestions]
+                
             # Get model predictions
-            start_time = self.metrics.time()
+            start_time = time.perf_counter()
             predictions = await self._generate_completions(context, language)
-            self.metrics.record('completion_time', self.metrics.time() - start_time)
+            self.timings.record(COMPLETION_TIME, time.perf_counter() - start_time)
             
             # Process and rank suggestions
             suggestions = await self._process_suggestions(predictions, context, language)
+            self._store_cached(cache_key, context, embedding, suggestions)
             
             return suggestions[:max_suggestions]
             
@@ -43,6 +74,86 @@ class CodeCompletion:
             self.metrics.record_error('completion_error', str(e))
             return []
             
+    def _cache_key(self, context: Dict[str, Any], language: str) -> bytes:
+        """Hash the context window that determines completions"""
+        raw = context['before'][-256:] + '\x00' + context['after'][:64] + '\x00' + language
+        return hashlib.blake2b(raw.encode(), digest_size=16).digest()
+        
+    def _get_exact(self, cache_key: bytes) -> Optional[List[CompletionSuggestion]]:
+        """Look up suggestions cached for exactly this context"""
+        if cache_key in self._exact_cache:
+            self._exact_cache.move_to_end(cache_key)
+            return list(self._exact_cache[cache_key])
+        return None
+        
+    def _get_similar(self, 
+                    embedding: Optional[np.ndarray], 
+                    context: Dict[str, Any]) -> Optional[List[CompletionSuggestion]]:
+        """Look up suggestions cached for a context with a similar embedding"""
+        if embedding is None or not self._semantic_entries:
+            return None
+            
+        scores = self._semantic_vectors[:len(self._semantic_entries)] @ embedding
+        candidates = np.flatnonzero(scores >= self.similarity_threshold)
+        for row in candidates[np.argsort(-scores[candidates])]:
+            cached_context, suggestions = self._semantic_entries[row]
+            # Indentation and scope must match or the completion won't fit
+            if (cached_context['indent'] == context['indent'] and
+                cached_context['scope'] == context['scope']):
+                self._touch_semantic(row)
+                return list(suggestions)
+                
+        return None
+        
+    def _store_cached(self, 
+                     cache_key: bytes, 
+                     context: Dict[str, Any],
+                     embedding: Optional[np.ndarray],
+                     suggestions: List[CompletionSuggestion]):
+        """Populate both cache tiers, evicting least recently used entries"""
+        self._exact_cache[cache_key] = suggestions
+        if len(self._exact_cache) > self.cache_size:
+            self._exact_cache.popitem(last=False)
+            
+        if embedding is not None:
+            if self._semantic_vectors is None:
+                self._semantic_vectors = np.empty((self.cache_size, len(embedding)), dtype=np.float32)
+                self._semantic_used = np.zeros(self.cache_size, dtype=np.int64)
+            if len(self._semantic_entries) < self.cache_size:
+                row = len(self._semantic_entries)
+                self._semantic_entries.append((context, suggestions))
+            else:
+                row = int(np.argmin(self._semantic_used))
+                self._semantic_entries[row] = (context, suggestions)
+            self._semantic_vectors[row] = embedding
+            self._touch_semantic(row)
+            
+    def _touch_semantic(self, row: int):
+        """Mark a semantic cache row as most recently used"""
+        self._semantic_tick += 1
+        self._semantic_used[row] = self._semantic_tick
+                
+    async def _embed(self, text: str) -> Optional[np.ndarray]:
+        """Embed text for semantic lookup, or None if no encoder is available"""
+        # Loading and encoding are CPU-bound; concurrent first calls share one load
+        if self._embedder_task is None:
+            self._embedder_task = asyncio.ensure_future(asyncio.to_thread(self._load_embedder))
+        if not self._embedder_task.done():
+            return None  # Skip the semantic tier rather than wait for the load
+        embedder = self._embedder_task.result()
+        if embedder is None:
+            return None
+        return await asyncio.to_thread(embedder.encode, text, normalize_embeddings=True)
+        
+    def _load_embedder(self):
+        """Load the sentence encoder, or None if it is unavailable"""
+        try:
+            from sentence_transformers import SentenceTransformer
+            return SentenceTransformer('sentence-transformers/all-MiniLM-L6-v2')
+        except Exception as e:
+            logger.info(f"Semantic completion cache disabled: {e}")
+            return None
+        
     def _extract_context(self, code: str, cursor_position: int) -> Dict[str, Any]:
         """Extract relevant context around cursor position"""
         start = max(0, cursor_position - self.context_window)
@@ -67,7 +178,7 @@ class CodeCompletion:
         model_input = self._prepare_model_input(context, language)
         
         # Get model predictions
-        predictions = await self.model.infer(model_input)
+        predictions = await self.inference.submit(model_input)
         
         return predictions
         
@@ -0,0 +1,115 @@
+from typing import Any, Optional, Tuple
+from pathlib import Path
+import hashlib
+import io
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import msgpack
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = '~/.cache/ai-assistant/infer.sqlite3'
+
+# msgpack extension type for numpy arrays stored in .npy format
+_NDARRAY_EXT = 1
+
+def _json_default(obj: Any) -> Any:
+    """Encode numpy values for hashing; anything else has no stable encoding"""
+    if isinstance(obj, np.ndarray):
+        return {'dtype': obj.dtype.str, 'data': obj.tolist()}
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Cannot build a cache key from {type(obj).__name__}")
+
+def _pack_default(obj: Any) -> Any:
+    """Store numpy arrays as .npy data inside msgpack"""
+    if isinstance(obj, np.ndarray):
+        buffer = io.BytesIO()
+        np.save(buffer, obj, allow_pickle=False)
+        return msgpack.ExtType(_NDARRAY_EXT, buffer.getvalue())
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Cannot cache a value of type {type(obj).__name__}")
+
+def _unpack_ext(code: int, data: bytes) -> Any:
+    if code == _NDARRAY_EXT:
+        return np.load(io.BytesIO(data), allow_pickle=False)
+    return msgpack.ExtType(code, data)
+
+class InferCache:
+    """Persistent store of model outputs keyed by model and input content"""
+
+    def __init__(self, path: Optional[str] = None, ttl: int = 7 * 86400):
+        self.path = Path(os.path.expanduser(path or DEFAULT_CACHE_PATH))
+        self.ttl = ttl
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def key(self, model_id: str, model_input: Any) -> str:
+        """Hash the model id with a canonical encoding of the input.
+        
+        Raises TypeError for inputs that cannot be encoded canonically.
+        """
+        canonical = json.dumps(
+            model_input,
+            sort_keys=True,
+            separators=(',', ':'),
+            default=_json_default
+        )
+        return hashlib.blake2b(f"{model_id}|{canonical}".encode()).hexdigest()
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Return (found, value) for a key that has not expired"""
+        try:
+            with self._lock:
+                row = self._connect().execute(
+                    "SELECT value FROM infer_cache WHERE key = ? AND expires_at > ?",
+                    (key, time.time())
+                ).fetchone()
+            if row is None:
+                return False, None
+            return True, msgpack.unpackb(
+                row[0], ext_hook=_unpack_ext, strict_map_key=False
+            )
+        except Exception as e:
+            logger.error(f"Inference cache read error: {e}")
+            return False, None
+
+    def set(self, key: str, value: Any):
+        """Store a value until the TTL elapses"""
+        try:
+            data = msgpack.packb(value, default=_pack_default)
+            with self._lock:
+                conn = self._connect()
+                conn.execute(
+                    "INSERT OR REPLACE INTO infer_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, data, time.time() + self.ttl)
+                )
+                conn.commit()
+        except Exception as e:
+            logger.error(f"Inference cache write error: {e}")
+
+    def close(self):
+        """Close the underlying database"""
+        with self._lock:
+            if self._conn:
+                self._conn.close()
+                self._conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database on first use, dropping expired rows"""
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS infer_cache "
+                "(key TEXT PRIMARY KEY, value BLOB, expires_at REAL)"
+            )
+            self._conn.execute("DELETE FROM infer_cache WHERE expires_at <= ?", (time.time(),))
+            self._conn.commit()
+        return self._conn
@@ -0,0 +1,74 @@
+from typing import Any, Optional
+import asyncio
+import os
+import weakref
+
+from .infer_cache import InferCache
+
+class InferenceWorker:
+    """Shares one result cache between every caller of a model.
+    
+    Batching is left to the models themselves; EdgeTPUModel already
+    coalesces concurrent infer calls into one interpreter invocation.
+    """
+
+    _workers: "weakref.WeakKeyDictionary[Any, InferenceWorker]" = weakref.WeakKeyDictionary()
+    _default_cache: Optional[InferCache] = None
+
+    def __init__(self, 
+                 model: Any, 
+                 cache: Optional[InferCache] = None,
+                 model_id: Optional[str] = None):
+        self.model = model
+        self.model_id = model_id or self._get_model_id(model)
+        if cache and not self.model_id:
+            raise ValueError("Caching inference results requires a model id")
+        self.cache = cache
+
+    @classmethod
+    def for_model(cls, model: Any) -> "InferenceWorker":
+        """Get the worker shared by every caller of this model"""
+        worker = cls._workers.get(model)
+        if worker is None:
+            cache = None
+            # Models that cannot be identified would share each other's results
+            if cls._get_model_id(model):
+                if cls._default_cache is None:
+                    cls._default_cache = InferCache()
+                cache = cls._default_cache
+            worker = cls(model, cache=cache)
+            cls._workers[model] = worker
+        return worker
+
+    async def submit(self, model_input: Any) -> Any:
+        """Run inference on an input, serving repeats from the cache"""
+        cache_key = None
+        if self.cache:
+            try:
+                cache_key = self.cache.key(self.model_id, model_input)
+            except TypeError:
+                pass  # Input has no canonical encoding; run it uncached
+        if cache_key:
+            found, result = await asyncio.to_thread(self.cache.get, cache_key)
+            if found:
+                return result
+
+        result = await self.model.infer(model_input)
+
+        if cache_key:
+            await asyncio.to_thread(self.cache.set, cache_key, result)
+        return result
+
+    @staticmethod
+    def _get_model_id(model: Any) -> Optional[str]:
+        """Identify a model by its weights file, or None when it has none"""
+        config = getattr(model, 'config', None)
+        model_path = getattr(config, 'model_path', None)
+        if not model_path:
+            return None
+        try:
+            # Retrained weights written to the same path must not hit old results
+            stat = os.stat(model_path)
+        except OSError:
+            return model_path
+        return f"{model_path}:{stat.st_size}:{stat.st_mtime_ns}"
@@ -1,16 +1,94 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable
 from dataclasses import dataclass
+from collections import OrderedDict
 import ast
 import cProfile
 import pstats
 import asyncio
+import hashlib
 from pathlib import Path
 
 from ..core.base_models import BaseModel, ModelConfig
 from ..monitoring.metrics import MetricsTracker
 from .code_analyzer import CodeAnalyzer, CodeMetrics
 
-@dataclass
+# Function names whose time is spent waiting on the OS rather than computing
+_IO_FUNCTIONS = frozenset({
+    'read', 'readinto', 'readline', 'recv', 'recv_into', 'send', 'sendall',
+    'write', 'select', 'poll', 'epoll', 'sleep', 'connect', 'accept', 'open'
+})
+_MEMORY_FUNCTIONS = frozenset({'collect', 'deepcopy', 'copy', 'dumps', 'loads'})
+
+def collect_profile(fn: Callable, *args, **kwargs) -> Dict[str, Any]:
+    """Profile a call and return profile_data for analyze_performance.
+    
+    Uses the pyinstrument sampling profiler when installed, which adds far less
+    overhead than deterministic tracing, and falls back to cProfile otherwise.
+    profile_data['source'] is 'pyinstrument' or 'cprofile' accordingly.
+    """
+    try:
+        from pyinstrument import Profiler
+    except ImportError:
+        Profiler = None
+        
+    if Profiler is not None:
+        profiler = Profiler(interval=0.001)
+        profiler.start()
+        try:
+            fn(*args, **kwargs)
+        finally:
+            profiler.stop()
+            
+        functions = []
+        stack = [profiler.last_session.root_frame()]
+        while stack:
+            frame = stack.pop()
+            if frame is None:
+                continue
+            stack.extend(frame.children)
+            if frame.function.startswith('['):
+                continue  # Synthetic [self]/[await] frames are already counted by their parent
+            functions.append({
+                'name': frame.function,
+                'file': frame.file_path,
+                'line': frame.line_no,
+                'total_time': frame.time,
+                'self_time': frame.total_self_time,
+                'calls': None  # Sampling does not count calls
+            })
+            
+        return {
+            'source': 'pyinstrument',
+            'total_time': profiler.last_session.duration,
+            'functions': functions
+        }
+        
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        fn(*args, **kwargs)
+    finally:
+        profiler.disable()
+        
+    stats = pstats.Stats(profiler)
+    functions = [
+        {
+            'name': name,
+            'file': file,
+            'line': line,
+            'total_time': cumulative,
+            'self_time': self_time,
+            'calls': calls
+        }
+        for (file, line, name), (_, calls, self_time, cumulative, _) in stats.stats.items()
+    ]
+    return {
+        'source': 'cprofile',
+        'total_time': stats.total_tt,
+        'functions': functions
+    }
+
+@dataclass(slots=True, frozen=True)
 class OptimizationSuggestion:
     category: str  # 'algorithm', 'memory', 'io', 'concurrency'
     description: str
@@ -25,6 +103,8 @@ class PerformanceOptimizer:
         self.model = BaseModel(model_config) if model_config else None
         self.analyzer = CodeAnalyzer()
         self.metrics = MetricsTracker()
+        self._tree_cache: OrderedDict = OrderedDict()
+        self._tree_cache_size = 128
         
     async def analyze_performance(self, 
                                 code: str,
@@ -34,16 +114,22 @@ class PerformanceOptimizer:
         try:
             suggestions = []
             
+            # Parse once and share the tree across analysis phases
+            try:
+                tree = self._parse(code, language)
+            except SyntaxError:
+                tree = None
+                
             # Static analysis for performance issues
-            static_suggestions = await self._static_analysis(code, language)
+            static_suggestions = await self._static_analysis(code, language, tree)
             suggestions.extend(static_suggestions)
             
             # Algorithm optimization suggestions
-            algo_suggestions = await self._analyze_algorithms(code)
+            algo_suggestions = await self._analyze_algorithms(code, tree)
             suggestions.extend(algo_suggestions)
             
             # Memory optimization suggestions
-            memory_suggestions = await self._analyze_memory_usage(code)
+            memory_suggestions = await self._analyze_memory_usage(code, tree)
             suggestions.extend(memory_suggestions)
             
             # I/O and concurrency optimization suggestions
@@ -59,12 +145,29 @@ class PerformanceOptimizer:
             self.metrics.record_error('performance_analysis_error', str(e))
             return []
             
-    async def _static_analysis(self, code: str, language: str) -> List[OptimizationSuggestion]:
+    def _parse(self, code: str, language: str) -> ast.AST:
+        """Parse code, reusing the tree for source that was seen recently"""
+        cache_key = (hashlib.blake2b(code.encode(), digest_size=16).digest(), language)
+        if cache_key in self._tree_cache:
+            self._tree_cache.move_to_end(cache_key)
+            return self._tree_cache[cache_key]
+            
+        tree = ast.parse(code)
+        self._tree_cache[cache_key] = tree
+        if len(self._tree_cache) > self._tree_cache_size:
+            self._tree_cache.popitem(last=False)
+        return tree
+        
+    async def _static_analysis(self, 
+                             code: str, 
+                             language: str,
+                             tree: Optional[ast.AST] = None) -> List[OptimizationSuggestion]:
         """Perform static analysis for performance issues"""
         suggestions = []
         
         try:
-            tree = ast.parse(code)
+            if tree is None:
+                tree = ast.parse(code)
             
             # Check for inefficient list operations
             suggestions.extend(self._check_list_operations(tree))
@@ -80,12 +183,15 @@ class PerformanceOptimizer:
             
         return suggestions
         
-    async def _analyze_algorithms(self, code: str) -> List[OptimizationSuggestion]:
+    async def _analyze_algorithms(self, 
+                                code: str,
+                                tree: Optional[ast.AST] = None) -> List[OptimizationSuggestion]:
         """Analyze and suggest algorithm optimizations"""
         suggestions = []
         
         try:
-            tree = ast.parse(code)
+            if tree is None:
+                tree = ast.parse(code)
             
             # Check for nested loops
             suggestions.extend(self._check_nested_loops(tree))
@@ -101,12 +207,15 @@ class PerformanceOptimizer:
             
         return suggestions
         
-    async def _analyze_memory_usage(self, code: str) -> List[OptimizationSuggestion]:
+    async def _analyze_memory_usage(self, 
+                                  code: str,
+                                  tree: Optional[ast.AST] = None) -> List[OptimizationSuggestion]:
         """Analyze memory usage and suggest optimizations"""
         suggestions = []
         
         try:
-            tree = ast.parse(code)
+            if tree is None:
+                tree = ast.parse(code)
             
             # Check for memory leaks
             suggestions.extend(self._check_memory_leaks(tree))
@@ -151,26 +260,90 @@ class PerformanceOptimizer:
             
         return suggestions
         
+    def _identify_bottlenecks(self, profile_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Classify the functions that dominate a profile"""
+        total_time = profile_data.get('total_time') or 0.0
+        if total_time <= 0:
+            return []
+            
+        # Sampled frames only see time spent on the stack, so pyinstrument
+        # data needs a lower share threshold than exact cProfile timings
+        threshold = 0.05 if profile_data.get('source') == 'pyinstrument' else 0.1
+        
+        bottlenecks = []
+        for func in profile_data.get('functions', []):
+            share = func['self_time'] / total_time
+            if share < threshold:
+                continue
+                
+            name = func['name'].strip('<>').split('.')[-1]
+            if name in _IO_FUNCTIONS:
+                bottleneck_type = 'io_bound'
+            elif name in _MEMORY_FUNCTIONS:
+                bottleneck_type = 'memory_bound'
+            else:
+                bottleneck_type = 'cpu_bound'
+                
+            bottlenecks.append({
+                'type': bottleneck_type,
+                'function': func['name'],
+                'location': {'file': func['file'], 'line': func['line']},
+                'time_share': share,
+                'calls': func.get('calls')
+            })
+            
+        return sorted(bottlenecks, key=lambda b: b['time_share'], reverse=True)
+        
     def _check_nested_loops(self, tree: ast.AST) -> List[OptimizationSuggestion]:
         """Check for and suggest optimizations for nested loops"""
         suggestions = []
         
-        for node in ast.walk(tree):
-            if isinstance(node, (ast.For, ast.While)):
-                nested_loops = self._find_nested_loops(node)
-                if nested_loops:
-                    suggestions.append(OptimizationSuggestion(
-                        category='algorithm',
-                        description='Nested loops detected - consider optimization',
-                        impact='High - O(n²) or worse complexity',
-                        changes=[{
-                            'type': 'refactor',
-                            'location': self._get_node_location(node),
-                            'suggestion': 'Consider using a more efficient data structure or algorithm'
-                        }],
-                        complexity_change='O(n²) -> O(n log n) potential',
-                        memory_change='No significant change',
-                        confidence=0.8
-                    ))
+        for node in self._find_nested_loops(tree):
+            suggestions.append(OptimizationSuggestion(
+                category='algorithm',
+                description='Nested loops detected - consider optimization',
+                impact='High - O(n²) or worse complexity',
+                changes=[{
+                    'type': 'refactor',
+                    'location': self._get_node_location(node),
+                    'suggestion': 'Consider using a more efficient data structure or algorithm'
+                }],
+                complexity_change='O(n²) -> O(n log n) potential',
+                memory_change='No significant change',
+                confidence=0.8
+            ))
                     
-        return suggestions 
\ No newline at end of file
+        return suggestions
+        
+    def _find_nested_loops(self, tree: ast.AST) -> List[ast.AST]:
+        """Find loops that contain another loop, in a single pass over the tree"""
+        outer_loops = {}
+        loop_types = (ast.For, ast.While)
+        
+        # Explicit stack of (node, nearest enclosing loop) avoids recursion
+        stack = [(tree, None)]
+        pop = stack.pop
+        push = stack.append
+        iter_child_nodes = ast.iter_child_nodes
+        
+        while stack:
+            node, enclosing_loop = pop()
+            if type(node) in loop_types:
+                # Flagging the nearest enclosing loop is enough: each loop
+                # level is flagged by the loop directly inside it
+                if enclosing_loop is not None:
+                    outer_loops[id(enclosing_loop)] = enclosing_loop
+                enclosing_loop = node
+            for child in iter_child_nodes(node):
+                push((child, enclosing_loop))
+                
+        return sorted(outer_loops.values(), key=lambda n: (n.lineno, n.col_offset))
+        
+    def _get_node_location(self, node: ast.AST) -> Dict[str, Any]:
+        """Get location information for an AST node"""
+        return {
+            'line': getattr(node, 'lineno', 0),
+            'column': getattr(node, 'col_offset', 0),
+            'end_line': getattr(node, 'end_lineno', 0),
+            'end_column': getattr(node, 'end_col_offset', 0)
+        }
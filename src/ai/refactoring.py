@@ -7,7 +7,7 @@ from ..core.base_models import BaseModel
 from ..monitoring.metrics import MetricsTracker
 from .code_analyzer import CodeAnalyzer
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class RefactoringSuggestion:
     description: str
     changes: List[Dict[str, Any]]
@@ -63,24 +63,40 @@ class RefactoringEngine:
                               suggestion: RefactoringSuggestion) -> str:
         """Apply a refactoring suggestion to code"""
         try:
-            result = code
-            
-            # Apply each change in the suggestion
+            # Resolve every change to a (start, end, text) edit on the original code
+            edits = []
             for change in suggestion.changes:
                 if change['type'] == 'replace':
-                    result = result.replace(
-                        change['old_code'],
-                        change['new_code']
-                    )
+                    start = change.get('start')
+                    if start is None:
+                        start = code.find(change['old_code'])
+                        if start < 0:
+                            continue
+                    end = change.get('end', start + len(change['old_code']))
+                    edits.append((start, end, change['new_code']))
                 elif change['type'] == 'insert':
                     pos = change['position']
-                    result = result[:pos] + change['code'] + result[pos:]
+                    edits.append((pos, pos, change['code']))
                 elif change['type'] == 'delete':
-                    start = change['start']
-                    end = change['end']
-                    result = result[:start] + result[end:]
+                    edits.append((change['start'], change['end'], ''))
+                    
+            # Apply all edits in one ordered pass so offsets stay valid
+            edits.sort(key=lambda edit: (edit[0], edit[1]))
+            parts = []
+            cursor = 0
+            for start, end, text in edits:
+                if start < cursor:
+                    self.metrics.record_error(
+                        'refactoring_overlap_error',
+                        f'Skipping edit at {start}-{end} overlapping a previous edit'
+                    )
+                    continue
+                parts.append(code[cursor:start])
+                parts.append(text)
+                cursor = end
+            parts.append(code[cursor:])
                     
-            return result
+            return ''.join(parts)
             
         except Exception as e:
             self.metrics.record_error('refactoring_apply_error', str(e))
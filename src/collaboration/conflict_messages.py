@@ -1,11 +1,46 @@
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
 from dataclasses import dataclass
+import functools
 from datetime import datetime
 
 from .conflict_resolver import Conflict
-from .sync_manager import SyncOperation
+from .operations import SyncOperation
 
-@dataclass
+# Action sets depend only on the conflict type, so they are shared by every message
+_MODIFY_ACTIONS = {
+    "accept_merge": "Accept Merged Changes",
+    "keep_mine": "Keep My Changes",
+    "keep_theirs": "Keep Their Changes",
+    "manual_resolve": "Resolve Manually"
+}
+
+_DELETE_ACTIONS = {
+    "accept_delete": "Accept Deletion",
+    "reject_delete": "Reject Deletion",
+    "manual_resolve": "Resolve Manually"
+}
+
+_INSERT_ACTIONS = {
+    "merge_sequential": "Insert Sequentially",
+    "keep_mine": "Keep My Insert",
+    "keep_theirs": "Keep Their Insert",
+    "manual_resolve": "Resolve Manually"
+}
+
+_GENERIC_ACTIONS = {
+    "retry": "Retry Operation",
+    "cancel": "Cancel Operation",
+    "manual_resolve": "Resolve Manually"
+}
+
+@functools.lru_cache(maxsize=256)
+def _modify_description(users: Tuple[str, ...]) -> str:
+    """Build the modify-conflict description for a set of users"""
+    names = ', '.join(users[:-1]) + f" and {users[-1]}"
+    return (f"Multiple users ({names}) have made changes to this file. "
+            "The system will attempt to merge these changes automatically.")
+
+@dataclass(slots=True, frozen=True)
 class ConflictMessage:
     title: str
     description: str
@@ -14,35 +49,28 @@ class ConflictMessage:
     metadata: Dict[str, Any]
 
 class ConflictMessageGenerator:
+    def __init__(self):
+        self._creators = {
+            'modify': self._create_modify_message,
+            'delete': self._create_delete_message,
+            'insert': self._create_insert_message
+        }
+        
     def generate_message(self, conflict: Conflict) -> ConflictMessage:
         """Generate appropriate UI message for a conflict"""
         if len(conflict.operations) < 2:
             return self._create_generic_message(conflict)
             
         primary_op = conflict.operations[0]
-        
-        if primary_op.operation_type == 'modify':
-            return self._create_modify_message(conflict)
-        elif primary_op.operation_type == 'delete':
-            return self._create_delete_message(conflict)
-        elif primary_op.operation_type == 'insert':
-            return self._create_insert_message(conflict)
-        else:
-            return self._create_generic_message(conflict)
+        create = self._creators.get(primary_op.operation_type, self._create_generic_message)
+        return create(conflict)
             
     def _create_modify_message(self, conflict: Conflict) -> ConflictMessage:
-        users = ', '.join(conflict.users[:-1]) + f" and {conflict.users[-1]}"
         return ConflictMessage(
             title="Conflicting Changes Detected",
-            description=f"Multiple users ({users}) have made changes to this file. "
-                       "The system will attempt to merge these changes automatically.",
+            description=_modify_description(tuple(conflict.users)),
             severity="warning",
-            actions={
-                "accept_merge": "Accept Merged Changes",
-                "keep_mine": "Keep My Changes",
-                "keep_theirs": "Keep Their Changes",
-                "manual_resolve": "Resolve Manually"
-            },
+            actions=_MODIFY_ACTIONS,
             metadata={
                 "conflict_type": "modify",
                 "users": conflict.users,
@@ -61,11 +89,7 @@ class ConflictMessageGenerator:
             description=f"User {deleting_user} is attempting to delete this file "
                        "while other users have pending changes.",
             severity="error",
-            actions={
-                "accept_delete": "Accept Deletion",
-                "reject_delete": "Reject Deletion",
-                "manual_resolve": "Resolve Manually"
-            },
+            actions=_DELETE_ACTIONS,
             metadata={
                 "conflict_type": "delete",
                 "deleting_user": deleting_user,
@@ -80,12 +104,7 @@ class ConflictMessageGenerator:
             title="Conflicting Insertions",
             description="Multiple users are attempting to insert content at the same location.",
             severity="warning",
-            actions={
-                "merge_sequential": "Insert Sequentially",
-                "keep_mine": "Keep My Insert",
-                "keep_theirs": "Keep Their Insert",
-                "manual_resolve": "Resolve Manually"
-            },
+            actions=_INSERT_ACTIONS,
             metadata={
                 "conflict_type": "insert",
                 "users": conflict.users,
@@ -99,11 +118,7 @@ class ConflictMessageGenerator:
             title="Conflict Detected",
             description="A conflict has been detected in the current operation.",
             severity="info",
-            actions={
-                "retry": "Retry Operation",
-                "cancel": "Cancel Operation",
-                "manual_resolve": "Resolve Manually"
-            },
+            actions=_GENERIC_ACTIONS,
             metadata={
                 "conflict_type": "generic",
                 "users": conflict.users,
@@ -1,12 +1,16 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, Iterable
 from dataclasses import dataclass
-import difflib
-from datetime import datetime
+import time
+from operator import attrgetter
+from diff_match_patch import diff_match_patch
 
 from ..monitoring.metrics import MetricsTracker
-from .sync_manager import SyncOperation
+from .operations import SyncOperation
 
-@dataclass
+_POSITION = attrgetter('position')
+_TIMESTAMP = attrgetter('timestamp')
+
+@dataclass(slots=True)
 class Conflict:
     operations: List[SyncOperation]
     users: List[str]
@@ -18,6 +22,12 @@ class ConflictResolver:
     def __init__(self):
         self.metrics = MetricsTracker()
         self.conflicts: Dict[str, List[Conflict]] = {}
+        self._dmp = diff_match_patch()
+        # A hunk may apply wherever earlier merges moved it, but only onto the
+        # exact text it was made against; otherwise it is a conflict
+        self._dmp.Match_Threshold = 0.01
+        self._dmp.Match_Distance = 1_000_000
+        self._dmp.Patch_DeleteThreshold = 0.0
         self.resolution_strategies = {
             'modify': self._resolve_modify_conflict,
             'delete': self._resolve_delete_conflict,
@@ -25,20 +35,57 @@ class ConflictResolver:
         }
         
     async def check_conflict(self, operation: SyncOperation, 
-                           recent_operations: List[SyncOperation]) -> Optional[Conflict]:
+                           recent_operations: Iterable[SyncOperation],
+                           now: Optional[float] = None) -> Optional[Conflict]:
         """Check if operation conflicts with recent operations"""
         try:
-            conflicts = []
+            # Most operations have no conflict, so only allocate a list on a hit
+            conflicts = None
+            
+            # Inlined _operations_conflict with the pushed operation's fields hoisted
+            op_path = operation.path
+            op_uid = operation.user_id
+            op_type = operation.operation_type
+            op_pos = operation.position
+            op_end = None
+            if op_type == 'modify' and op_pos is not None:
+                op_end = op_pos + max(len(operation.content or ''), 1)
             
             for recent in recent_operations:
-                if self._operations_conflict(operation, recent):
-                    conflicts.append(recent)
+                if recent.path != op_path or recent.user_id == op_uid:
+                    continue
+                    
+                recent_type = recent.operation_type
+                if op_type == 'modify' and recent_type == 'modify':
+                    recent_pos = recent.position
+                    if op_end is None or recent_pos is None:
+                        hit = True
+                    else:
+                        recent_end = recent_pos + max(len(recent.content or ''), 1)
+                        hit = op_pos < recent_end and recent_pos < op_end
+                elif op_type == 'delete' or recent_type == 'delete':
+                    hit = True
+                elif op_type == 'insert' and recent_type == 'insert':
+                    hit = abs(op_pos - recent.position) < 2
+                else:
+                    hit = False
+                    
+                if hit:
+                    if conflicts is None:
+                        conflicts = [recent]
+                    else:
+                        conflicts.append(recent)
+                    
+            if conflicts is not None:
+                # Ordered dedup: the pushing user first, then the others
+                users = {operation.user_id: None}
+                for op in conflicts:
+                    users[op.user_id] = None
                     
-            if conflicts:
                 conflict = Conflict(
                     operations=[operation] + conflicts,
-                    users=list(set(op.user_id for op in conflicts + [operation])),
-                    timestamp=datetime.now().timestamp()
+                    users=list(users),
+                    timestamp=now if now is not None else time.time()
                 )
                 
                 if operation.path not in self.conflicts:
@@ -80,7 +127,10 @@ class ConflictResolver:
             return None
             
     def _operations_conflict(self, op1: SyncOperation, op2: SyncOperation) -> bool:
-        """Determine if two operations conflict"""
+        """Determine if two operations conflict
+        
+        check_conflict inlines this logic; keep the two in sync.
+        """
         # Same file
         if op1.path != op2.path:
             return False
@@ -103,15 +153,26 @@ class ConflictResolver:
             
         return False
         
+    def _modifications_overlap(self, op1: SyncOperation, op2: SyncOperation) -> bool:
+        """Determine if two modifications touch overlapping ranges"""
+        if op1.position is None or op2.position is None:
+            return True
+        end1 = op1.position + max(len(op1.content or ''), 1)
+        end2 = op2.position + max(len(op2.content or ''), 1)
+        return op1.position < end2 and op2.position < end1
+        
     async def _resolve_modify_conflict(self, operations: List[SyncOperation]) -> Optional[SyncOperation]:
         """Resolve conflict between modify operations"""
         try:
             # Sort by timestamp
-            sorted_ops = sorted(operations, key=lambda x: x.timestamp)
+            sorted_ops = sorted(operations, key=_TIMESTAMP)
             base_content = sorted_ops[0].content
             
-            # Apply diff3 merge
-            merger = difflib.Differ()
+            # Identical saves (e.g. auto-save re-syncs) need no merge
+            if all(op.content == base_content for op in sorted_ops[1:]):
+                return sorted_ops[-1]
+                
+            # Apply three-way merge against the oldest content
             merged_content = self._merge_changes(
                 base_content,
                 [op.content for op in sorted_ops[1:]]
@@ -124,7 +185,7 @@ class ConflictResolver:
                     content=merged_content,
                     position=None,
                     user_id='system',
-                    timestamp=datetime.now().timestamp(),
+                    timestamp=time.time(),
                     version=-1
                 )
                 
@@ -144,7 +205,7 @@ class ConflictResolver:
         """Resolve conflict between insert operations"""
         try:
             # Sort by position
-            sorted_ops = sorted(operations, key=lambda x: x.position)
+            sorted_ops = sorted(operations, key=_POSITION)
             
             # Adjust positions to prevent overlap
             current_pos = sorted_ops[0].position
@@ -162,7 +223,7 @@ class ConflictResolver:
                 content=merged_content,
                 position=sorted_ops[0].position,
                 user_id='system',
-                timestamp=datetime.now().timestamp(),
+                timestamp=time.time(),
                 version=-1
             )
             
@@ -171,22 +232,45 @@ class ConflictResolver:
             return None
             
     def _merge_changes(self, base: str, changes: List[str]) -> Optional[str]:
-        """Merge multiple changes using diff3"""
+        """Three-way merge each change's edits against base into one result"""
         try:
-            # Convert strings to lines
-            base_lines = base.splitlines(True)
-            change_lines = [c.splitlines(True) for c in changes]
-            
-            # Create differ
-            d = difflib.Differ()
-            
-            # Merge each change sequentially
-            current = base_lines
-            for change in change_lines:
-                diff = list(d.compare(current, change))
-                current = [l[2:] for l in diff if l.startswith('  ') or l.startswith('+ ')]
-                
-            return ''.join(current)
+            # Each change is diffed once against base, never against merged output
+            patch_sets = [
+                self._make_patch(base, change)
+                for change in changes
+                if change != base
+            ]
+            
+            # Patches carry base positions and are relocated in the merged text
+            current = base
+            for patches in patch_sets:
+                current, applied = self._dmp.patch_apply(patches, current)
+                if not all(applied):
+                    return None
+                    
+            return current
             
         except Exception:
-            return None 
\ No newline at end of file
+            return None
+            
+    def _make_patch(self, base: str, change: str) -> List[Any]:
+        """Build the patch turning base into change"""
+        # Only diff the region between the unchanged prefix and suffix
+        prefix, suffix = self._trim_common(base, change)
+        diffs = self._dmp.diff_main(
+            base[prefix:len(base) - suffix],
+            change[prefix:len(change) - suffix],
+            False
+        )
+        if prefix:
+            diffs.insert(0, (self._dmp.DIFF_EQUAL, base[:prefix]))
+        if suffix:
+            diffs.append((self._dmp.DIFF_EQUAL, base[len(base) - suffix:]))
+        self._dmp.diff_cleanupSemantic(diffs)
+        return self._dmp.patch_make(base, diffs)
+        
+    def _trim_common(self, a: str, b: str) -> Tuple[int, int]:
+        """Get the lengths of the common prefix and the non-overlapping common suffix"""
+        prefix = self._dmp.diff_commonPrefix(a, b)
+        suffix = self._dmp.diff_commonSuffix(a[prefix:], b[prefix:])
+        return prefix, suffix
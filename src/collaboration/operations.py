@@ -0,0 +1,21 @@
+import sys
+from dataclasses import dataclass
+from typing import Optional
+
+# Not frozen: version is stamped on processing and positions shift during
+# conflict resolution
+@dataclass(slots=True)
+class SyncOperation:
+    operation_type: str  # 'insert', 'delete', 'modify'
+    path: str
+    content: Optional[str]
+    position: Optional[int]
+    user_id: str
+    timestamp: float
+    version: int
+    
+    def __post_init__(self):
+        # Types arrive from JSON and the database; intern them so dispatch
+        # lookups and comparisons against literals hit the identity fast path
+        if isinstance(self.operation_type, str):
+            self.operation_type = sys.intern(self.operation_type)
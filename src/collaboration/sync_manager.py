@@ -1,26 +1,24 @@
-from typing import Dict, List, Any, Optional, Set
+from typing import Dict, List, Any, Optional, Set, Deque, Iterable, Tuple
 import asyncio
-import json
+import bisect
+import os
+import time
+from collections import deque
+from itertools import chain
 from dataclasses import dataclass
-from datetime import datetime
 from pathlib import Path
+import orjson
+from cachetools import TTLCache
 
+from .operations import SyncOperation
 from .conflict_resolver import ConflictResolver, Conflict
 from .conflict_messages import ConflictMessageGenerator
 from .version_control import VersionControlManager
 from ..database.schema_manager import DatabaseManager
-from ..core.base_models import BaseModel
 from ..monitoring.metrics import MetricsTracker
 
-@dataclass
-class SyncOperation:
-    operation_type: str  # 'insert', 'delete', 'modify'
-    path: str
-    content: Optional[str]
-    position: Optional[int]
-    user_id: str
-    timestamp: float
-    version: int
+# Subscribing to this path receives user and commit events for the whole session
+GLOBAL_PATH = '__global__'
 
 @dataclass
 class SyncState:
@@ -28,7 +26,60 @@ class SyncState:
     operations: List[SyncOperation]
     users: Set[str]
     locked_files: Dict[str, str]  # path -> user_id
-    recent_operations: Dict[str, List[SyncOperation]]  # path -> recent ops
+    recent_operations: Dict[str, Dict[str, Deque[SyncOperation]]]  # path -> user_id -> recent ops
+
+class PositionIndex:
+    """Recent operations on one file, sorted by position for window queries"""
+    
+    def __init__(self):
+        self._keys: List[Tuple[int, int]] = []  # (position, id(op))
+        self._ops: List[SyncOperation] = []
+        self.unpositioned: List[SyncOperation] = []
+        self.deletes: List[SyncOperation] = []  # Positioned deletes conflict with anything
+        self.max_span = 1  # Upper bound on any indexed operation's length
+        
+    def add(self, operation: SyncOperation):
+        if operation.position is None:
+            self.unpositioned.append(operation)
+            return
+        if operation.operation_type == 'delete':
+            self.deletes.append(operation)
+            return
+        key = (operation.position, id(operation))
+        idx = bisect.bisect_right(self._keys, key)
+        self._keys.insert(idx, key)
+        self._ops.insert(idx, operation)
+        self.max_span = max(self.max_span, len(operation.content or ''))
+        
+    def remove(self, operation: SyncOperation):
+        if operation.position is None:
+            self.unpositioned.remove(operation)
+            return
+        if operation.operation_type == 'delete':
+            self.deletes.remove(operation)
+            return
+        self._discard(operation.position, operation)
+        
+    def move(self, operation: SyncOperation, old_position: Optional[int]):
+        """Re-key an indexed operation whose position changed from old_position"""
+        if old_position is None or operation.operation_type == 'delete':
+            return
+        if self._discard(old_position, operation):
+            self.add(operation)
+            
+    def _discard(self, position: int, operation: SyncOperation) -> bool:
+        idx = bisect.bisect_left(self._keys, (position, id(operation)))
+        if idx >= len(self._ops) or self._ops[idx] is not operation:
+            return False
+        del self._keys[idx]
+        del self._ops[idx]
+        return True
+            
+    def window(self, start: int, end: int) -> List[SyncOperation]:
+        """Get operations positioned in [start, end)"""
+        lo = bisect.bisect_left(self._keys, (start,))
+        hi = bisect.bisect_left(self._keys, (end,))
+        return self._ops[lo:hi]
 
 class SyncManager:
     def __init__(self, repo_path: str, db_url: str):
@@ -42,28 +93,49 @@ class SyncManager:
         self.metrics = MetricsTracker()
         self.operation_queue = asyncio.Queue()
         self.subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        # Same set as subscribers[GLOBAL_PATH], so subscribe/unsubscribe maintain it
+        self.global_subscribers: Set[asyncio.Queue] = self.subscribers.setdefault(GLOBAL_PATH, set())
         self.conflict_resolver = ConflictResolver()
         self.message_generator = ConflictMessageGenerator()
         self.vc_manager = VersionControlManager(repo_path)
         self.db_manager = DatabaseManager(db_url)
         self.recent_ops_limit = 10
+        self.process_batch_size = 64
+        self.position_index: Dict[str, PositionIndex] = {}  # path -> recent ops by position
         self.pending_operations: Dict[str, List[SyncOperation]] = {}  # user_id -> operations
+        self.db_flush_interval = 0.05  # seconds
+        self.db_flush_max_backoff = 5.0  # seconds between retries while inserts fail
+        self.db_flush_max_rows = 10000  # rows kept buffered across failed flushes
+        self._db_flush_buffer: List[Dict[str, Any]] = []  # operation rows awaiting insert
+        self._db_flush_task: Optional[asyncio.Task] = None
+        # path -> exists, reused for one second and bounded to recently edited files
+        self._path_exists_cache: TTLCache = TTLCache(maxsize=4096, ttl=1.0)
         
     async def start(self):
         """Start the sync manager"""
         self.running = True
         await self.db_manager.init_db()
         asyncio.create_task(self._process_operations())
+        self._db_flush_task = asyncio.create_task(self._db_flusher())
         
     async def stop(self):
         """Stop the sync manager"""
         self.running = False
+        if self._db_flush_task:
+            self._db_flush_task.cancel()
+            try:
+                await self._db_flush_task
+            except asyncio.CancelledError:
+                pass
+            self._db_flush_task = None
+        await self._flush_db_buffer()
         
     async def connect_user(self, user_id: str):
         """Register a new user connection"""
         self.state.users.add(user_id)
         self.subscribers[user_id] = set()
-        self.pending_operations[user_id] = []
+        # Reuse the list kept from an earlier session so reconnects don't reallocate
+        self.pending_operations.setdefault(user_id, [])
         # Create user branch
         await self.vc_manager.create_branch_for_user(user_id)
         await self.db_manager.update_user_activity(user_id)
@@ -76,7 +148,7 @@ class SyncManager:
             await self._commit_user_changes(user_id)
         self.state.users.remove(user_id)
         self._release_user_locks(user_id)
-        del self.pending_operations[user_id]
+        self.pending_operations[user_id].clear()
         await self._broadcast_user_event('disconnected', user_id)
         
     async def subscribe(self, user_id: str, path: str) -> asyncio.Queue:
@@ -94,6 +166,7 @@ class SyncManager:
             
     async def push_operation(self, operation: SyncOperation):
         """Push a new sync operation"""
+        now = time.time()
         try:
             # Validate operation
             if not self._validate_operation(operation):
@@ -103,13 +176,19 @@ class SyncManager:
             if not self._can_modify_file(operation.path, operation.user_id):
                 raise PermissionError("File is locked by another user")
                 
-            # Check for conflicts
-            recent_ops = self.state.recent_operations.get(operation.path, [])
-            conflict = await self.conflict_resolver.check_conflict(operation, recent_ops)
+            # Check for conflicts against other users' nearby recent operations only
+            recent_ops = self._conflict_candidates(operation)
+            conflict = await self.conflict_resolver.check_conflict(operation, recent_ops, now)
             
             if conflict:
-                # Try to resolve conflict
+                # Try to resolve conflict; this may shift recent operations' positions
+                old_positions = [(op, op.position) for op in conflict.operations]
                 resolution = await self.conflict_resolver.resolve_conflict(conflict)
+                index = self.position_index.get(operation.path)
+                if index is not None:
+                    for op, old_position in old_positions:
+                        if op.position != old_position:
+                            index.move(op, old_position)
                 if resolution:
                     operation = resolution
                 else:
@@ -122,15 +201,15 @@ class SyncManager:
             # Add to pending operations
             self.pending_operations[operation.user_id].append(operation)
             
-            # Record in database
-            await self.db_manager.record_operation(
-                operation_type=operation.operation_type,
-                path=operation.path,
-                user_id=operation.user_id,
-                content=operation.content,
-                position=operation.position,
-                version=operation.version
-            )
+            # Buffer for the next bulk insert
+            self._db_flush_buffer.append({
+                'type': operation.operation_type,
+                'path': operation.path,
+                'user_id': operation.user_id,
+                'content': operation.content,
+                'position': operation.position,
+                'version': operation.version
+            })
             
             # Update metrics
             self.metrics.record('sync_operation_pushed', {
@@ -143,6 +222,19 @@ class SyncManager:
             self.metrics.record_error('sync_operation_error', str(e))
             raise
             
+    async def push_operations(self, operations: List[SyncOperation]):
+        """Push a batch of sync operations, checking different files concurrently"""
+        groups: Dict[str, List[SyncOperation]] = {}
+        for operation in operations:
+            groups.setdefault(operation.path, []).append(operation)
+            
+        await asyncio.gather(*(self._push_in_order(group) for group in groups.values()))
+        
+    async def _push_in_order(self, operations: List[SyncOperation]):
+        """Push operations on one file sequentially, as they share recent state"""
+        for operation in operations:
+            await self.push_operation(operation)
+            
     async def acquire_lock(self, path: str, user_id: str) -> bool:
         """Attempt to acquire a lock on a file"""
         if path in self.state.locked_files:
@@ -165,21 +257,36 @@ class SyncManager:
         """Process queued operations"""
         while self.running:
             try:
-                operation = await self.operation_queue.get()
+                # Drain whatever else is already queued so a burst costs one loop turn
+                batch = [await self.operation_queue.get()]
+                while len(batch) < self.process_batch_size:
+                    try:
+                        batch.append(self.operation_queue.get_nowait())
+                    except asyncio.QueueEmpty:
+                        break
+                        
+                await self._apply_and_broadcast_batch(batch)
                 
+            except Exception as e:
+                self.metrics.record_error('sync_processing_error', str(e))
+                
+    async def _apply_and_broadcast_batch(self, batch: List[SyncOperation]):
+        """Apply a batch of operations in order, then broadcast them per file"""
+        by_path: Dict[str, List[SyncOperation]] = {}
+        for operation in batch:
+            try:
                 # Apply operation
                 self._apply_operation(operation)
                 
                 # Update recent operations
                 self._update_recent_operations(operation)
                 
-                # Broadcast to subscribers
-                await self._broadcast_operation(operation)
-                
                 # Update version
                 self.state.version += 1
                 operation.version = self.state.version
                 
+                by_path.setdefault(operation.path, []).append(operation)
+                
                 # Record metrics
                 self.metrics.record('sync_operation_processed', {
                     'type': operation.operation_type,
@@ -189,6 +296,55 @@ class SyncManager:
             except Exception as e:
                 self.metrics.record_error('sync_processing_error', str(e))
                 
+        # Broadcast to subscribers, keeping each queue's events in order
+        await asyncio.gather(*(
+            self._put_all(queue, operations)
+            for path, operations in by_path.items()
+            for queue in self.subscribers.get(path, ())
+        ))
+        
+    async def _put_all(self, queue: asyncio.Queue, events: List[Any]):
+        """Put events on one queue in order"""
+        for event in events:
+            await queue.put(event)
+                
+    async def _db_flusher(self):
+        """Periodically write buffered operations to the database"""
+        delay = self.db_flush_interval
+        while self.running:
+            await asyncio.sleep(delay)
+            try:
+                await self._flush_db_buffer()
+                delay = self.db_flush_interval
+            except Exception:
+                # Rows stay buffered; back off while the database is failing
+                delay = min(delay * 2, self.db_flush_max_backoff)
+            
+    async def _flush_db_buffer(self):
+        """Insert all buffered operation rows in one batch
+        
+        On failure the rows go back to the front of the buffer for the next
+        flush and the error is re-raised.
+        """
+        if not self._db_flush_buffer:
+            return
+            
+        # Swap before awaiting so pushes during the insert start a new batch
+        rows, self._db_flush_buffer = self._db_flush_buffer, []
+        try:
+            await self.db_manager.record_operations_bulk(rows)
+        except Exception as e:
+            self.metrics.record_error('sync_db_flush_error', str(e))
+            self._db_flush_buffer[:0] = rows
+            overflow = len(self._db_flush_buffer) - self.db_flush_max_rows
+            if overflow > 0:
+                del self._db_flush_buffer[:overflow]
+                self.metrics.record_error(
+                    'sync_db_flush_dropped',
+                    f"Dropped {overflow} oldest operation rows"
+                )
+            raise
+                
     def _apply_operation(self, operation: SyncOperation):
         """Apply an operation to the sync state"""
         if operation.operation_type == 'insert':
@@ -201,12 +357,6 @@ class SyncManager:
             # Handle modify
             pass
             
-    async def _broadcast_operation(self, operation: SyncOperation):
-        """Broadcast operation to subscribers"""
-        if operation.path in self.subscribers:
-            for queue in self.subscribers[operation.path]:
-                await queue.put(operation)
-                
     def _validate_operation(self, operation: SyncOperation) -> bool:
         """Validate a sync operation"""
         # Check operation type
@@ -214,7 +364,7 @@ class SyncManager:
             return False
             
         # Check path exists
-        if not Path(operation.path).exists():
+        if not self._path_exists(operation.path):
             return False
             
         # Check user is connected
@@ -223,6 +373,13 @@ class SyncManager:
             
         return True
         
+    def _path_exists(self, path: str) -> bool:
+        """Check a path exists, reusing the result for repeated edits to the same file"""
+        exists = self._path_exists_cache.get(path)
+        if exists is None:
+            exists = self._path_exists_cache[path] = os.path.exists(path)
+        return exists
+        
     def _can_modify_file(self, path: str, user_id: str) -> bool:
         """Check if user can modify a file"""
         if path not in self.state.locked_files:
@@ -231,25 +388,20 @@ class SyncManager:
         
     def _release_user_locks(self, user_id: str):
         """Release all locks held by a user"""
-        paths_to_release = [
-            path for path, lock_holder in self.state.locked_files.items()
-            if lock_holder == user_id
-        ]
-        for path in paths_to_release:
-            del self.state.locked_files[path]
+        self.state.locked_files = {
+            path: lock_holder for path, lock_holder in self.state.locked_files.items()
+            if lock_holder != user_id
+        }
             
     async def _broadcast_user_event(self, event_type: str, user_id: str):
         """Broadcast user connection/disconnection events"""
         event = {
             'type': f'user_{event_type}',
             'user_id': user_id,
-            'timestamp': datetime.now().timestamp()
+            'timestamp': time.time()
         }
-        # Broadcast to all connected users
-        for user in self.state.users:
-            if user in self.subscribers:
-                for queue in self.subscribers[user]:
-                    await queue.put(event)
+        # Broadcast to everyone subscribed to session-wide events
+        await self._fan_out(self.global_subscribers, orjson.dumps(event))
                     
     async def _broadcast_lock_event(self, event_type: str, path: str, user_id: str):
         """Broadcast lock acquisition/release events"""
@@ -257,24 +409,54 @@ class SyncManager:
             'type': f'lock_{event_type}',
             'path': path,
             'user_id': user_id,
-            'timestamp': datetime.now().timestamp()
+            'timestamp': time.time()
         }
         # Broadcast to subscribers of the file
-        if path in self.subscribers:
-            for queue in self.subscribers[path]:
-                await queue.put(event) 
+        await self._fan_out(self.subscribers.get(path, ()), orjson.dumps(event))
                 
     def _update_recent_operations(self, operation: SyncOperation):
         """Update recent operations for a file"""
-        if operation.path not in self.state.recent_operations:
-            self.state.recent_operations[operation.path] = []
+        by_user = self.state.recent_operations.setdefault(operation.path, {})
+        if operation.user_id not in by_user:
+            # Bounded so the oldest operation is dropped on append
+            by_user[operation.user_id] = deque(maxlen=self.recent_ops_limit)
             
-        recent = self.state.recent_operations[operation.path]
+        recent = by_user[operation.user_id]
+        index = self.position_index.setdefault(operation.path, PositionIndex())
+        if len(recent) == recent.maxlen:
+            index.remove(recent[0])
         recent.append(operation)
+        index.add(operation)
         
-        # Keep only recent operations
-        if len(recent) > self.recent_ops_limit:
-            recent.pop(0)
+    def _conflict_candidates(self, operation: SyncOperation) -> Iterable[SyncOperation]:
+        """Narrow recent operations by other users to those that could conflict"""
+        index = self.position_index.get(operation.path)
+        if index is None:
+            return ()
+            
+        position = operation.position
+        if operation.operation_type == 'insert' and position is not None:
+            nearby = index.window(position - 1, position + 2)
+        elif operation.operation_type == 'modify' and position is not None:
+            end = position + max(len(operation.content or ''), 1)
+            nearby = index.window(position - index.max_span, end)
+        else:
+            # Deletes and unpositioned operations can conflict with anything
+            return self._recent_operations_by_others(operation.path, operation.user_id)
+            
+        return [
+            op for op in chain(nearby, index.unpositioned, index.deletes)
+            if op.user_id != operation.user_id
+        ]
+        
+    def _recent_operations_by_others(self, path: str, user_id: str) -> Iterable[SyncOperation]:
+        """Iterate recent operations on a file made by users other than user_id"""
+        by_user = self.state.recent_operations.get(path)
+        if not by_user:
+            return ()
+        return chain.from_iterable(
+            ops for uid, ops in by_user.items() if uid != user_id
+        )
             
     async def _broadcast_conflict(self, conflict: Conflict):
         """Broadcast conflict to affected users"""
@@ -301,14 +483,16 @@ class SyncManager:
             'metadata': message.metadata
         }
         
-        for user_id in conflict.users:
-            if user_id in self.subscribers:
-                for queue in self.subscribers[user_id]:
-                    await queue.put(event) 
+        await self._fan_out(
+            [queue for user_id in conflict.users for queue in self.subscribers.get(user_id, ())],
+            orjson.dumps(event)
+        )
                     
     async def _commit_user_changes(self, user_id: str):
         """Commit pending changes for a user"""
-        operations = self.pending_operations[user_id]
+        pending = self.pending_operations[user_id]
+        # Snapshot: operations pushed while the commit is awaited stay pending
+        operations = list(pending)
         if not operations:
             return
             
@@ -325,8 +509,8 @@ class SyncManager:
                 )
                 
                 if commit_hash:
-                    # Clear pending operations
-                    self.pending_operations[user_id] = []
+                    # Clear the committed operations in place
+                    del pending[:len(operations)]
                     
                     # Broadcast commit event
                     await self._broadcast_commit_event(user_id, commit_hash, operations)
@@ -358,12 +542,17 @@ class SyncManager:
             'type': 'commit',
             'user_id': user_id,
             'commit_hash': commit_hash,
-            'timestamp': datetime.now().timestamp(),
+            'timestamp': time.time(),
             'files': [op.path for op in operations]
         }
         
-        # Broadcast to all users
-        for user in self.state.users:
-            if user in self.subscribers:
-                for queue in self.subscribers[user]:
-                    await queue.put(event) 
\ No newline at end of file
+        # Broadcast to everyone subscribed to session-wide events
+        await self._fan_out(self.global_subscribers, orjson.dumps(event))
+        
+    async def _fan_out(self, queues: Iterable[asyncio.Queue], event: Any):
+        """Put an event on every queue concurrently
+        
+        Dict events are serialized once by the caller and shared as bytes;
+        operations are queued as objects for in-process consumers.
+        """
+        await asyncio.gather(*(queue.put(event) for queue in queues)) 
\ No newline at end of file
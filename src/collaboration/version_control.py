@@ -1,12 +1,44 @@
-from typing import List, Dict, Any, Optional
-from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Iterator, Tuple
+from dataclasses import dataclass, asdict
+from collections import OrderedDict
 import asyncio
+import json
+import logging
+import os
+import tempfile
+import time
 import git
 from pathlib import Path
 from datetime import datetime
 
 from ..monitoring.metrics import MetricsTracker
-from .sync_manager import SyncOperation
+from .operations import SyncOperation
+
+logger = logging.getLogger(__name__)
+
+HISTORY_CACHE_FILE = '.ai_hist_cache.json'
+
+# Each commit starts with RS; header fields are split by US and the raw
+# message is closed with GS, followed by the NUL-separated name-status list
+_LOG_FORMAT = '%x1e%H%x1f%an%x1f%ct%x1f%B%x1d'
+
+def _parse_log(output: str) -> Iterator[Tuple[str, str, float, str, Dict[str, str]]]:
+    """Parse `git log --name-status -z` output written with _LOG_FORMAT"""
+    for record in output.split('\x1e')[1:]:
+        header, _, status = record.partition('\x1d')
+        hexsha, author, timestamp, message = header.split('\x1f', 3)
+        
+        fields = [f.strip('\n') for f in status.split('\0')]
+        fields = [f for f in fields if f]
+        changes = {}
+        i = 0
+        while i < len(fields):
+            change_type = fields[i]
+            changes[str(Path(fields[i + 1]))] = change_type[0]
+            # Renames and copies list both the old and the new path
+            i += 3 if change_type[0] in 'RC' else 2
+            
+        yield hexsha, author, float(timestamp), message, changes
 
 @dataclass
 class CommitInfo:
@@ -20,21 +52,46 @@ class CommitInfo:
 class VersionControlManager:
     def __init__(self, repo_path: str):
         self.repo_path = Path(repo_path)
-        self.repo = git.Repo(repo_path)
+        # Object reads go through git's long-lived cat-file --batch processes
+        self.repo = git.Repo(repo_path, odbt=git.GitCmdObjectDB)
+        # Applied per command so the user's repo config is left untouched
+        self.repo.git.set_persistent_git_options(c='core.preloadindex=true')
+        self._commit_graph_task: Optional[asyncio.Task] = None
+        # Only switch_branch moves HEAD, so the branch name is tracked there
+        self._active_branch = self._read_active_branch()
         self.metrics = MetricsTracker()
         self.lock = asyncio.Lock()
+        self.branch_cache_ttl = 5.0  # seconds
+        self._branch_tip_cache: Dict[str, List[str]] = {}  # commit sha -> branches at it
+        self._branch_tip_cache_time = 0.0
+        self._commit_branch_cache: Dict[str, str] = {}  # commit sha -> containing branch
+        self.history_cache_size = 256
+        # (path, HEAD sha, max_entries) -> history, least recently used first
+        self._hist_cache: "OrderedDict[Tuple[str, str, int], List[CommitInfo]]" = OrderedDict()
+        self._hist_cache_path = Path(self.repo.git_dir) / HISTORY_CACHE_FILE
+        # Histories computed within history_save_delay seconds share one write
+        self.history_save_delay = 1.0
+        self._hist_dirty = False
+        self._hist_save_task: Optional[asyncio.Task] = None
+        self._hist_save_lock = asyncio.Lock()
+        self._load_history_cache()
         
     async def stage_changes(self, operations: List[SyncOperation]) -> bool:
         """Stage changes from sync operations"""
         try:
+            # The last operation on a path decides whether it is staged or removed
+            final_ops = {str(Path(op.path)): op.operation_type for op in operations}
+            adds, dels = [], []
+            for path, operation_type in final_ops.items():
+                (dels if operation_type == 'delete' else adds).append(path)
+                
+            # One index write per kind instead of one per operation
             async with self.lock:
-                for op in operations:
-                    file_path = Path(op.path)
-                    if op.operation_type == 'delete':
-                        self.repo.index.remove(str(file_path))
-                    else:
-                        self.repo.index.add(str(file_path))
-                        
+                if dels:
+                    self.repo.index.remove(dels, working_tree=False)
+                if adds:
+                    self.repo.index.add(adds)
+                    
                 return True
                 
         except Exception as e:
@@ -49,7 +106,7 @@ class VersionControlManager:
         try:
             async with self.lock:
                 if branch:
-                    current = self.repo.active_branch.name
+                    current = self._active_branch
                     if branch != current:
                         await self.switch_branch(branch)
                         
@@ -59,10 +116,13 @@ class VersionControlManager:
                     author=git.Actor(author, f"{author}@example.com")
                 )
                 
+                # Branch tips moved
+                self._branch_tip_cache_time = 0.0
+                
                 self.metrics.record('git_commit', {
                     'hash': commit.hexsha,
                     'author': author,
-                    'branch': branch or self.repo.active_branch.name
+                    'branch': branch or self._active_branch
                 })
                 
                 return commit.hexsha
@@ -79,6 +139,7 @@ class VersionControlManager:
                     self.repo.create_head(branch_name)
                     
                 self.repo.heads[branch_name].checkout()
+                self._active_branch = branch_name
                 return True
                 
         except Exception as e:
@@ -89,30 +150,54 @@ class VersionControlManager:
                              max_entries: int = 10) -> List[CommitInfo]:
         """Get commit history for a file"""
         try:
-            commits = []
             file_path = Path(file_path)
             
-            for commit in self.repo.iter_commits(paths=str(file_path)):
-                if len(commits) >= max_entries:
-                    break
-                    
-                # Get change type
-                changes = {}
-                for parent in commit.parents:
-                    diff = parent.diff(commit, paths=str(file_path))
-                    for d in diff:
-                        changes[str(Path(d.a_path))] = d.change_type
-                        
-                commits.append(CommitInfo(
-                    hash=commit.hexsha,
-                    author=commit.author.name,
-                    message=commit.message,
-                    timestamp=commit.committed_date,
-                    changes=changes,
-                    branch=self._get_branch_for_commit(commit)
-                ))
+            if self._commit_graph_task is None:
+                self._commit_graph_task = asyncio.create_task(
+                    asyncio.to_thread(self._write_commit_graph)
+                )
+                
+            # History only changes when HEAD moves
+            cache_key = (str(file_path), self.repo.head.commit.hexsha, max_entries)
+            cached = self._hist_cache.get(cache_key)
+            if cached is not None:
+                self._hist_cache.move_to_end(cache_key)
+                return list(cached)
                 
-            return commits
+            # One git process for the whole history instead of a diff per commit
+            output = await asyncio.to_thread(
+                self.repo.git.log,
+                f'-n{max_entries}',
+                '--name-status',
+                '-z',
+                f'--pretty=format:{_LOG_FORMAT}',
+                '--',
+                str(file_path)
+            )
+            
+            entries = list(_parse_log(output))
+            branches = await asyncio.to_thread(
+                lambda: [self._get_branch_for_commit(entry[0]) for entry in entries]
+            )
+            
+            commits = [
+                CommitInfo(
+                    hash=hexsha,
+                    author=author,
+                    message=message,
+                    timestamp=timestamp,
+                    changes=changes,
+                    branch=branch
+                )
+                for (hexsha, author, timestamp, message, changes), branch in zip(entries, branches)
+            ]
+            
+            self._hist_cache[cache_key] = commits
+            if len(self._hist_cache) > self.history_cache_size:
+                self._hist_cache.popitem(last=False)
+            self._schedule_history_save()
+            
+            return list(commits)
             
         except Exception as e:
             self.metrics.record_error('git_history_error', str(e))
@@ -150,9 +235,115 @@ class VersionControlManager:
             self.metrics.record_error('git_merge_error', str(e))
             return False
             
-    def _get_branch_for_commit(self, commit) -> str:
+    def _read_active_branch(self) -> Optional[str]:
+        """Get the checked-out branch name, or None with a detached HEAD"""
+        try:
+            return self.repo.active_branch.name
+        except TypeError:
+            return None
+            
+    def _write_commit_graph(self):
+        """Write the commit-graph file that speeds up history walks"""
+        try:
+            self.repo.git.commit_graph('write', '--reachable')
+        except git.GitCommandError as e:
+            logger.warning(f"Could not write commit-graph: {e}")
+            
+    def _load_history_cache(self):
+        """Restore file histories saved by an earlier run"""
+        try:
+            if not self._hist_cache_path.exists():
+                return
+            with open(self._hist_cache_path) as f:
+                for path, head, max_entries, commits in json.load(f):
+                    self._hist_cache[(path, head, max_entries)] = [
+                        CommitInfo(**commit) for commit in commits
+                    ]
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable history cache: {e}")
+            self._hist_cache.clear()
+            
+    def _schedule_history_save(self):
+        """Mark the history cache changed and make sure a write is pending"""
+        self._hist_dirty = True
+        if self._hist_save_task is None or self._hist_save_task.done():
+            self._hist_save_task = asyncio.create_task(self._debounced_history_save())
+            
+    async def _debounced_history_save(self):
+        # Keep going while histories arrive during a write, so none are left unsaved
+        while self._hist_dirty:
+            await asyncio.sleep(self.history_save_delay)
+            await self.flush_history_cache()
+            
+    async def flush_history_cache(self):
+        """Write pending file histories to disk now; call before shutting down"""
+        async with self._hist_save_lock:
+            if not self._hist_dirty:
+                return
+            self._hist_dirty = False
+            await asyncio.to_thread(self._save_history_cache, list(self._hist_cache.items()))
+            
+    def _save_history_cache(self, items: List[Tuple[Tuple[str, str, int], List[CommitInfo]]]):
+        """Write file histories in LRU order so a reload keeps the eviction order"""
+        tmp_path = None
+        try:
+            data = [
+                [path, head, max_entries, [asdict(commit) for commit in commits]]
+                for (path, head, max_entries), commits in items
+            ]
+            # A temp file per write, so concurrent writers never publish a torn file
+            with tempfile.NamedTemporaryFile(
+                'w',
+                dir=self._hist_cache_path.parent,
+                prefix=self._hist_cache_path.name,
+                suffix='.tmp',
+                delete=False
+            ) as f:
+                tmp_path = f.name
+                json.dump(data, f)
+            os.replace(tmp_path, self._hist_cache_path)
+        except Exception as e:
+            logger.warning(f"Failed to save history cache: {e}")
+            if tmp_path:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+            
+    def _get_branch_for_commit(self, hexsha: str) -> str:
         """Get branch name for a commit"""
-        for head in self.repo.heads:
-            if commit in self.repo.iter_commits(head):
-                return head.name
-        return "unknown" 
\ No newline at end of file
+        tips = self._get_branch_tips()
+        if hexsha in tips:
+            return tips[hexsha][0]
+            
+        branch = self._commit_branch_cache.get(hexsha)
+        if branch is None:
+            # Let git walk reachability once instead of iterating every branch's commits
+            branch = self.repo.git.for_each_ref(
+                '--count=1',
+                '--format=%(refname:short)',
+                '--contains', hexsha,
+                'refs/heads'
+            ).strip() or "unknown"
+            self._commit_branch_cache[hexsha] = branch
+        return branch
+        
+    def _get_branch_tips(self) -> Dict[str, List[str]]:
+        """Map branch tip commits to branch names, refreshed after a short TTL"""
+        now = time.monotonic()
+        if now - self._branch_tip_cache_time >= self.branch_cache_ttl:
+            tips: Dict[str, List[str]] = {}
+            output = self.repo.git.for_each_ref(
+                '--format=%(objectname) %(refname:short)',
+                'refs/heads'
+            )
+            for line in output.splitlines():
+                hexsha, _, name = line.partition(' ')
+                tips.setdefault(hexsha, []).append(name)
+                
+            # Containment answers only change when a branch moves
+            if tips != self._branch_tip_cache:
+                self._commit_branch_cache.clear()
+            self._branch_tip_cache = tips
+            self._branch_tip_cache_time = now
+        return self._branch_tip_cache 
\ No newline at end of file
@@ -1,12 +1,12 @@
 import asyncio
-import json
+import orjson
 import logging
-from typing import Dict, Set, Optional
+from typing import Dict, Set, Optional, Tuple, Union
 import websockets
 from dataclasses import asdict
 from datetime import datetime
 
-from .sync_manager import SyncManager, SyncOperation
+from .sync_manager import GLOBAL_PATH, SyncManager, SyncOperation
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +16,8 @@ class CollaborationServer:
         self.port = port
         self.sync_manager = SyncManager()
         self.connections: Dict[str, Set[websockets.WebSocketServerProtocol]] = {}
+        # user_id -> (queue, forwarding task) for session-wide user and commit events
+        self._global_forwarders: Dict[str, Tuple[asyncio.Queue, asyncio.Task]] = {}
         
     async def start(self):
         """Start the collaboration server"""
@@ -33,7 +35,7 @@ class CollaborationServer:
         try:
             # Authenticate user
             auth_message = await websocket.recv()
-            auth_data = json.loads(auth_message)
+            auth_data = orjson.loads(auth_message)
             user_id = auth_data['user_id']
             
             # Register connection
@@ -41,6 +43,14 @@ class CollaborationServer:
                 self.connections[user_id] = set()
             self.connections[user_id].add(websocket)
             
+            # One subscription per user; _send_to_user reaches all their sockets
+            if user_id not in self._global_forwarders:
+                queue = await self.sync_manager.subscribe(user_id, GLOBAL_PATH)
+                self._global_forwarders[user_id] = (
+                    queue,
+                    asyncio.create_task(self._forward_updates(user_id, queue))
+                )
+                
             # Connect to sync manager
             await self.sync_manager.connect_user(user_id)
             
@@ -48,19 +58,31 @@ class CollaborationServer:
                 async for message in websocket:
                     await self._handle_message(user_id, message)
             finally:
-                # Cleanup on disconnect
-                self.connections[user_id].remove(websocket)
-                if not self.connections[user_id]:
-                    del self.connections[user_id]
+                # Cleanup on disconnect. The socket may already be gone if a
+                # send found it closed, and the entry if another handler emptied it
+                conns = self.connections.get(user_id)
+                if conns is not None:
+                    conns.discard(websocket)
+                    if not conns:
+                        del self.connections[user_id]
+                        await self._stop_global_forwarding(user_id)
                 await self.sync_manager.disconnect_user(user_id)
                 
         except Exception as e:
             logger.error(f"WebSocket error: {str(e)}")
             
+    async def _stop_global_forwarding(self, user_id: str):
+        """Drop a user's session-wide subscription once their last socket closes"""
+        forwarder = self._global_forwarders.pop(user_id, None)
+        if forwarder:
+            queue, task = forwarder
+            task.cancel()
+            await self.sync_manager.unsubscribe(GLOBAL_PATH, queue)
+            
     async def _handle_message(self, user_id: str, message: str):
         """Handle incoming WebSocket messages"""
         try:
-            data = json.loads(message)
+            data = orjson.loads(message)
             message_type = data['type']
             
             if message_type == 'operation':
@@ -122,12 +144,26 @@ class CollaborationServer:
         except Exception as e:
             logger.error(f"Update forwarding error: {str(e)}")
             
-    async def _send_to_user(self, user_id: str, message: Dict):
+    async def _send_to_user(self, user_id: str, message: Union[Dict, bytes]):
         """Send message to all connections of a user"""
         if user_id in self.connections:
-            message_str = json.dumps(message)
-            for websocket in self.connections[user_id]:
-                try:
-                    await websocket.send(message_str)
-                except websockets.exceptions.ConnectionClosed:
-                    continue 
\ No newline at end of file
+            if isinstance(message, bytes):
+                # Already serialized by the sync manager's broadcast
+                payload = message
+            else:
+                payload = orjson.dumps(message, option=orjson.OPT_SERIALIZE_NUMPY)
+            # Decoded so clients keep receiving text frames
+            message_str = payload.decode()
+            
+            # Send to every device at once so one slow client doesn't delay the rest
+            sockets = list(self.connections[user_id])
+            results = await asyncio.gather(
+                *(websocket.send(message_str) for websocket in sockets),
+                return_exceptions=True
+            )
+            for websocket, result in zip(sockets, results):
+                if isinstance(result, websockets.exceptions.ConnectionClosed):
+                    # The user may have fully disconnected while the sends ran
+                    self.connections.get(user_id, set()).discard(websocket)
+                elif isinstance(result, Exception):
+                    logger.error(f"Send error for {user_id}: {result}")
@@ -1,10 +1,17 @@
 from dataclasses import dataclass
-from typing import Any, Optional, Dict, Union
+from typing import Any, Optional, Dict, Union, List, Tuple
+import asyncio
+import concurrent.futures
+import itertools
 import numpy as np
+import threading
 import time
 from collections import OrderedDict
-import redis
-from functools import lru_cache
+from cachetools import LRUCache
+import redis.asyncio as aioredis
+import msgpack
+import lz4.frame
+import xxhash
 import logging
 from src.monitoring.metrics import MetricsCollector
 from src.core.load_balancer import LoadBalancer, LoadBalancerConfig, ServiceNode
@@ -17,7 +24,8 @@ class CacheConfig:
     local_size: int = 1000  # Number of items in local LRU cache
     redis_url: Optional[str] = None  # Redis connection URL
     ttl: int = 3600  # Time to live for cached items (1 hour)
-    compression: bool = True
+    compression: bool = True  # lz4, lossless
+    quantize: bool = False  # Store float arrays as int8; lossy, opt in per model
 
 @dataclass
 class ModelConfig:
@@ -33,12 +41,21 @@ class CacheManager:
     def __init__(self, config: CacheConfig):
         self.config = config
         self.metrics = MetricsCollector()
-        self._local_cache = OrderedDict()
+        self._local_cache = LRUCache(maxsize=config.local_size)
         self._redis_client = None
+        # Plain counters on the hot path; reported through get_stats
+        self._local_hits = 0
+        self._redis_hits = 0
+        self._misses = 0
+        # Redis requests coalesced into one pipelined round trip per window
+        self.redis_batch_window = 0.001  # seconds
+        self._pending_get: Dict[str, List[asyncio.Future]] = {}
+        self._pending_set: Dict[str, bytes] = {}
+        self._redis_flush_task: Optional[asyncio.Task] = None
         
         if config.redis_url:
             try:
-                self._redis_client = redis.from_url(config.redis_url)
+                self._redis_client = aioredis.from_url(config.redis_url)
                 logger.info("Connected to Redis cache")
             except Exception as e:
                 logger.error(f"Failed to connect to Redis: {e}")
@@ -46,23 +63,27 @@ class CacheManager:
     async def get(self, key: str) -> Optional[np.ndarray]:
         """Get item from cache, trying local first then Redis"""
         # Check local cache
-        if key in self._local_cache:
-            self.metrics.increment("cache.local.hits")
-            return self._local_cache[key]
+        value = self._local_cache.get(key)
+        if value is not None:
+            self._local_hits += 1
+            return value
             
         # Check Redis if available
         if self._redis_client:
             try:
-                cached_data = self._redis_client.get(key)
+                future = asyncio.get_running_loop().create_future()
+                self._pending_get.setdefault(key, []).append(future)
+                self._schedule_redis_flush()
+                cached_data = await future
                 if cached_data:
-                    self.metrics.increment("cache.redis.hits")
-                    result = np.frombuffer(cached_data, dtype=np.float32)
+                    self._redis_hits += 1
+                    result = self._deserialize(cached_data)
                     self._update_local_cache(key, result)
                     return result
             except Exception as e:
                 logger.error(f"Redis get error: {e}")
                 
-        self.metrics.increment("cache.misses")
+        self._misses += 1
         return None
         
     async def set(self, key: str, value: np.ndarray):
@@ -71,35 +92,117 @@ class CacheManager:
         
         if self._redis_client:
             try:
-                self._redis_client.setex(
-                    key,
-                    self.config.ttl,
-                    value.tobytes(),
-                )
+                self._pending_set[key] = self._serialize(value)
+                self._schedule_redis_flush()
             except Exception as e:
                 logger.error(f"Redis set error: {e}")
                 
+    def _schedule_redis_flush(self):
+        """Start the flush task unless one is already running"""
+        if self._redis_flush_task is None or self._redis_flush_task.done():
+            self._redis_flush_task = asyncio.create_task(self._flush_redis())
+            
+    async def _flush_redis(self):
+        """Send pending gets and sets as one MGET/MSET pipeline per window"""
+        # Loop until nothing is pending, so requests queued during a round
+        # trip are picked up without a new task being scheduled
+        while self._pending_get or self._pending_set:
+            await asyncio.sleep(self.redis_batch_window)
+            gets, self._pending_get = self._pending_get, {}
+            sets, self._pending_set = self._pending_set, {}
+            
+            values = [None] * len(gets)
+            try:
+                async with self._redis_client.pipeline(transaction=False) as pipe:
+                    if sets:
+                        pipe.mset(sets)
+                        for key in sets:
+                            pipe.expire(key, self.config.ttl)
+                    if gets:
+                        pipe.mget(list(gets))
+                    results = await pipe.execute()
+                if gets:
+                    values = results[-1]
+            except Exception as e:
+                logger.error(f"Redis batch error: {e}")
+                
+            for futures, value in zip(gets.values(), values):
+                for future in futures:
+                    if not future.done():
+                        future.set_result(value)
+                
+    def _serialize(self, value: np.ndarray) -> bytes:
+        """Pack an array with its shape and dtype, compressing the data if enabled
+        
+        With quantize on, float arrays are stored as int8 with a per-tensor
+        scale. Integer outputs, such as EdgeTPU int8 tensors, are stored as
+        they are.
+        """
+        packed = {
+            's': list(value.shape),
+            'd': str(value.dtype),
+            'c': self.config.compression
+        }
+        if self.config.quantize and np.issubdtype(value.dtype, np.floating):
+            scale = float(np.max(np.abs(value), initial=0.0)) / 127.0 or 1.0
+            value = np.round(value / scale).astype(np.int8)
+            packed['q'] = scale
+            
+        data = value.tobytes()
+        if self.config.compression:
+            data = lz4.frame.compress(data)
+        packed['b'] = data
+        return msgpack.packb(packed)
+        
+    def _deserialize(self, payload: bytes) -> np.ndarray:
+        """Rebuild an array packed by _serialize"""
+        packed = msgpack.unpackb(payload)
+        data = packed['b']
+        if packed['c']:
+            data = lz4.frame.decompress(data)
+        if 'q' in packed:
+            quantized = np.frombuffer(data, dtype=np.int8).reshape(packed['s'])
+            return (quantized * packed['q']).astype(packed['d'])
+        return np.frombuffer(data, dtype=packed['d']).reshape(packed['s'])
+                
     def _update_local_cache(self, key: str, value: np.ndarray):
         """Update local LRU cache"""
         self._local_cache[key] = value
-        if len(self._local_cache) > self.config.local_size:
-            self._local_cache.popitem(last=False)
             
     async def get_stats(self) -> Dict[str, Any]:
         """Get cache statistics"""
         return {
             "local_cache_size": len(self._local_cache),
-            "local_cache_hits": await self.metrics.get_count("cache.local.hits"),
-            "redis_cache_hits": await self.metrics.get_count("cache.redis.hits"),
-            "cache_misses": await self.metrics.get_count("cache.misses"),
+            "local_cache_hits": self._local_hits,
+            "redis_cache_hits": self._redis_hits,
+            "cache_misses": self._misses,
         }
 
 class BaseModel:
     def __init__(self):
         self.inference_times: list = []
-        self.total_inferences: int = 0
+        self.total_inferences = 0
         self.metrics = MetricsCollector()
         
+    @property
+    def total_inferences(self) -> int:
+        return self._total_inferences
+        
+    @total_inferences.setter
+    def total_inferences(self, value: int):
+        self._total_inferences = value
+        self._inference_counter = itertools.count(value + 1)
+        
+    def _count_inference(self):
+        """Count one inference without a lock; safe to call from executor threads.
+        
+        next() on the counter is atomic, so no increment is lost; a reader may
+        briefly see a slightly lower total while two threads race to store it.
+        """
+        count = next(self._inference_counter)
+        if count > self._total_inferences:
+            self._total_inferences = count
+        
     async def get_performance_metrics(self) -> Dict[str, float]:
         if not self.inference_times:
             return {'avg_time': 0, 'total_inferences': 0}
@@ -119,6 +222,20 @@ class EdgeTPUModel(BaseModel):
         self.config = ModelConfig(model_path, device, cache_config or CacheConfig())
         self.model = None
         self.cache = CacheManager(self.config.cache_config)
+        self.max_batch = 8
+        self.batch_window = 0.002  # seconds to wait for more requests to join a batch
+        self._batch_queue: asyncio.Queue = asyncio.Queue()
+        self._batch_task: Optional[asyncio.Task] = None
+        # Single worker: the TFLite interpreter is not reentrant
+        self._tpu_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        # Per executor thread batch buffer, reused while the batch shape repeats
+        self._scratch = threading.local()
+        # Batches are padded to these row counts so only a few shapes need interpreters
+        self.batch_buckets = (1, 2, 4, 8)
+        # One interpreter per bucket, for up to two distinct sample shapes
+        self.max_interpreters = 2 * len(self.batch_buckets)
+        # input shape -> (interpreter, input details, output details), least recently used first
+        self._interps: "OrderedDict[Tuple[int, ...], Tuple[Any, list, list]]" = OrderedDict()
         self._initialize_model()
     
     def _initialize_model(self):
@@ -126,15 +243,15 @@ class EdgeTPUModel(BaseModel):
             from tflite_runtime.interpreter import Interpreter
             from tflite_runtime.interpreter import load_delegate
             
-            edge_tpu_delegate = load_delegate('libedgetpu.so.1')
-            self.model = Interpreter(
-                model_path=self.config.model_path,
-                experimental_delegates=[edge_tpu_delegate],
-                num_threads=4
-            )
+            self._interpreter_cls = Interpreter
+            self._edge_tpu_delegate = load_delegate('libedgetpu.so.1')
+            self.model = self._create_interpreter()
             self.model.allocate_tensors()
             self._input_details = self.model.get_input_details()
             self._output_details = self.model.get_output_details()
+            self._interps[tuple(self._input_details[0]['shape'])] = (
+                self.model, self._input_details, self._output_details
+            )
         except Exception as e:
             raise RuntimeError(f"Failed to initialize EdgeTPU model: {e}")
             
@@ -143,27 +260,155 @@ class EdgeTPUModel(BaseModel):
         start_time = time.time()
         try:
             # Generate cache key
-            cache_key = hash(input_data.tobytes())
+            cache_key = self._cache_key(input_data)
             
             # Check cache
-            cached_result = await self.cache.get(str(cache_key))
+            cached_result = await self.cache.get(cache_key)
             if cached_result is not None:
                 return cached_result
             
-            # Run inference
-            self.model.set_tensor(self._input_details[0]['index'], input_data)
-            self.model.invoke()
-            result = self.model.get_tensor(self._output_details[0]['index'])
+            # Run inference alongside any other pending requests
+            if self._batch_task is None or self._batch_task.done():
+                self._batch_task = asyncio.create_task(self._run_batches())
+            future = asyncio.get_running_loop().create_future()
+            await self._batch_queue.put((input_data, future))
+            result = await future
             
             # Update cache
-            await self.cache.set(str(cache_key), result)
+            await self.cache.set(cache_key, result)
             
             return result
         finally:
             inference_time = time.time() - start_time
             self.inference_times.append(inference_time)
-            self.total_inferences += 1
-            await self.metrics.record_metric("inference_time", inference_time)
+            self._count_inference()
+            self.metrics.record_nowait("inference_time", inference_time)
+
+    async def _run_batches(self):
+        """Coalesce queued requests into batched interpreter invocations"""
+        while True:
+            items = await self._drain_batch()
+            
+            # Only inputs with matching trailing shape and dtype can be stacked
+            groups: Dict[Tuple, List[Tuple[np.ndarray, asyncio.Future]]] = {}
+            for input_data, future in items:
+                groups.setdefault((input_data.shape[1:], input_data.dtype), []).append((input_data, future))
+                
+            for group in groups.values():
+                inputs = [input_data for input_data, _ in group]
+                try:
+                    outputs = await asyncio.get_running_loop().run_in_executor(
+                        self._tpu_executor, self._invoke_batch, inputs
+                    )
+                except Exception as e:
+                    for _, future in group:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+                    
+                for (_, future), output in zip(group, outputs):
+                    if not future.done():
+                        future.set_result(output)
+                        
+    async def _drain_batch(self) -> List[Tuple[np.ndarray, asyncio.Future]]:
+        """Wait for one request, then collect more until the batch fills or the window closes"""
+        items = [await self._batch_queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.batch_window
+        
+        while len(items) < self.max_batch:
+            timeout = deadline - asyncio.get_running_loop().time()
+            if timeout <= 0:
+                break
+            try:
+                items.append(await asyncio.wait_for(self._batch_queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+                
+        return items
+        
+    def _invoke_batch(self, inputs: List[np.ndarray]) -> List[np.ndarray]:
+        """Run inputs through the interpreter in one invocation and split the output"""
+        if len(inputs) == 1:
+            return [self._invoke(inputs[0])]
+            
+        rows = sum(len(input_data) for input_data in inputs)
+        batch = self._scratch_buffer(
+            (self._bucket_rows(rows),) + inputs[0].shape[1:],
+            inputs[0].dtype
+        )
+        np.concatenate(inputs, out=batch[:rows])
+        batch[rows:] = 0
+        try:
+            output = self._invoke(batch)[:rows]
+        except (RuntimeError, ValueError) as e:
+            # Model has a fixed batch dimension; stop batching and run one at a time.
+            # The singles run on their own interpreters, so drop the batch one
+            # rather than keep an interpreter that may be half allocated
+            logger.warning(f"Batched inference unsupported, falling back to single requests: {e}")
+            self.max_batch = 1
+            self._interps.pop(batch.shape, None)
+            return [self._invoke(input_data) for input_data in inputs]
+            
+        sizes = [len(input_data) for input_data in inputs]
+        return np.split(output, np.cumsum(sizes)[:-1])
+        
+    def _bucket_rows(self, rows: int) -> int:
+        """Round a batch's row count up to the next bucket size"""
+        for size in self.batch_buckets:
+            if rows <= size:
+                return size
+        return 1 << (rows - 1).bit_length()
+        
+    def _scratch_buffer(self, shape: Tuple[int, ...], dtype: np.dtype) -> np.ndarray:
+        """Get this thread's batch buffer, reallocating only when shape or dtype change.
+        
+        Safe to reuse because set_tensor copies the batch into the interpreter.
+        """
+        buf = getattr(self._scratch, 'buf', None)
+        if buf is None or buf.shape != shape or buf.dtype != dtype:
+            buf = self._scratch.buf = np.empty(shape, dtype)
+        return buf
+        
+    def _create_interpreter(self):
+        """Create an interpreter for the model; the EdgeTPU delegate is shared"""
+        return self._interpreter_cls(
+            model_path=self.config.model_path,
+            experimental_delegates=[self._edge_tpu_delegate],
+            num_threads=4
+        )
+        
+    def _get_interpreter(self, shape: Tuple[int, ...]) -> Tuple[Any, list, list]:
+        """Get an interpreter already allocated for an input shape"""
+        entry = self._interps.get(shape)
+        if entry is not None:
+            self._interps.move_to_end(shape)
+            return entry
+            
+        interpreter = self._create_interpreter()
+        interpreter.resize_tensor_input(self._input_details[0]['index'], shape)
+        interpreter.allocate_tensors()
+        entry = (interpreter, interpreter.get_input_details(), interpreter.get_output_details())
+        
+        self._interps[shape] = entry
+        if len(self._interps) > self.max_interpreters:
+            self._interps.popitem(last=False)
+        return entry
+        
+    def _invoke(self, input_data: np.ndarray) -> np.ndarray:
+        """Run one invocation on the interpreter specialized for the input's shape"""
+        interpreter, input_details, output_details = self._get_interpreter(input_data.shape)
+        interpreter.set_tensor(input_details[0]['index'], input_data)
+        interpreter.invoke()
+        return interpreter.get_tensor(output_details[0]['index'])
+        
+    def _cache_key(self, input_data: np.ndarray) -> str:
+        """Hash an input without copying it; stable across processes for Redis.
+        
+        Prefixed with the model path, as several models may share one Redis.
+        """
+        hasher = xxhash.xxh3_128(f"{input_data.dtype}{input_data.shape}".encode())
+        hasher.update(np.ascontiguousarray(input_data).view(np.uint8))
+        return f"{self.config.model_path}:{hasher.hexdigest()}"
 
 class CPUModel:
     def __init__(self, model_path: str):
@@ -1,7 +1,8 @@
-import json
+import os
+import orjson
 from pathlib import Path
 from typing import Dict, Any, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
 
 @dataclass
 class SystemConfig:
@@ -16,25 +17,35 @@ class SystemConfig:
 class ConfigManager:
     def __init__(self, config_path: str = "config.json"):
         self.config_path = Path(config_path)
+        self._last_written: Optional[bytes] = None
         self.config = self._load_config()
         
     def _load_config(self) -> SystemConfig:
         """Load configuration from file or create default"""
         if self.config_path.exists():
-            with open(self.config_path) as f:
-                config_dict = json.load(f)
-                return SystemConfig(**config_dict)
+            config_dict = orjson.loads(self.config_path.read_bytes())
+            return SystemConfig(**config_dict)
         return SystemConfig()
         
     def save_config(self):
         """Save current configuration to file"""
-        config_dict = {
-            key: getattr(self.config, key)
-            for key in self.config.__annotations__
-        }
-        with open(self.config_path, 'w') as f:
-            json.dump(config_dict, f, indent=2)
+        data = orjson.dumps(asdict(self.config), option=orjson.OPT_INDENT_2)
+        if data == self._last_written:
+            return
             
+        # Write a sibling file and swap it in so a crash never leaves a torn config
+        tmp_path = self.config_path.with_suffix('.tmp')
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, self.config_path)
+        self._last_written = data
+            
+    def __getattr__(self, key: str) -> Any:
+        """Expose configuration values as attributes, e.g. manager.cache_dir"""
+        # Only reached for names not found on the manager itself
+        if key == 'config':
+            raise AttributeError(key)
+        return getattr(self.config, key)
+        
     def get(self, key: str) -> Any:
         """Get configuration value"""
         return getattr(self.config, key)
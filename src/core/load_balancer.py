@@ -1,10 +1,12 @@
 from typing import List, Dict, Optional, Any
 import asyncio
+import random
 from dataclasses import dataclass
 import logging
 from datetime import datetime
 import aiohttp
 import json
+import numpy as np
 from src.monitoring.metrics import MetricsCollector
 
 logger = logging.getLogger(__name__)
@@ -37,6 +39,12 @@ class LoadBalancer:
         self._current_index = 0
         self._health_check_task = None
         self._session: Optional[aiohttp.ClientSession] = None
+        # Caps in-flight health checks on large clusters
+        self._health_check_semaphore = asyncio.Semaphore(32)
+        # Healthy nodes and their cumulative weights, rebuilt after health checks
+        # and node changes rather than on every request
+        self._healthy: List[ServiceNode] = []
+        self._weights_cdf: np.ndarray = np.zeros(0)
         
     async def start(self):
         """Start the load balancer and health checks"""
@@ -55,12 +63,14 @@ class LoadBalancer:
     async def add_node(self, node: ServiceNode):
         """Add a new service node"""
         self.nodes.append(node)
+        self._refresh_healthy()
         await self.metrics.increment("lb.nodes.total")
         logger.info(f"Added node {node.id} at {node.host}:{node.port}")
         
     async def remove_node(self, node_id: str):
         """Remove a service node"""
         self.nodes = [n for n in self.nodes if n.id != node_id]
+        self._refresh_healthy()
         await self.metrics.decrement("lb.nodes.total")
         logger.info(f"Removed node {node_id}")
         
@@ -69,7 +79,7 @@ class LoadBalancer:
         if not self.nodes:
             return None
             
-        healthy_nodes = [n for n in self.nodes if n.healthy]
+        healthy_nodes = self._healthy
         if not healthy_nodes:
             logger.error("No healthy nodes available")
             return None
@@ -77,18 +87,13 @@ class LoadBalancer:
         if self.config.algorithm == "least_connections":
             return min(healthy_nodes, key=lambda n: n.current_load)
         elif self.config.algorithm == "weighted_round_robin":
-            # Implement weighted selection based on node load
-            weights = [1 - (n.current_load / n.max_load) for n in healthy_nodes]
-            total_weight = sum(weights)
-            if total_weight == 0:
+            # Weighted selection based on node load
+            total_weight = self._weights_cdf[-1]
+            if total_weight <= 0:
                 return healthy_nodes[0]
-            
-            r = asyncio.random.random() * total_weight
-            for node, weight in zip(healthy_nodes, weights):
-                r -= weight
-                if r <= 0:
-                    return node
-            return healthy_nodes[-1]
+                
+            r = random.random() * total_weight
+            return healthy_nodes[int(np.searchsorted(self._weights_cdf, r, side='right'))]
         else:  # round_robin
             self._current_index = (self._current_index + 1) % len(healthy_nodes)
             return healthy_nodes[self._current_index]
@@ -106,8 +111,16 @@ class LoadBalancer:
                 await asyncio.sleep(1)
                 
     async def _check_all_nodes(self):
-        """Check health of all nodes"""
-        for node in self.nodes:
+        """Check health of all nodes concurrently"""
+        await asyncio.gather(
+            *(self._check_node(node) for node in self.nodes),
+            return_exceptions=True
+        )
+        self._refresh_healthy()
+        
+    async def _check_node(self, node: ServiceNode):
+        """Check health of a single node"""
+        async with self._health_check_semaphore:
             try:
                 async with self._session.get(
                     f"http://{node.host}:{node.port}/health",
@@ -125,14 +138,26 @@ class LoadBalancer:
                 logger.warning(f"Health check failed for node {node.id}: {e}")
                 node.healthy = False
                 await self.metrics.increment("lb.health_checks.failed")
-            
+                
             node.last_health_check = datetime.now()
+        
+    def _refresh_healthy(self):
+        """Rebuild the healthy node list and its cumulative weight table"""
+        healthy = [n for n in self.nodes if n.healthy]
+        loads = np.fromiter(
+            (n.current_load / n.max_load for n in healthy),
+            dtype=float,
+            count=len(healthy)
+        )
+        # Overloaded nodes get zero weight rather than negative
+        self._weights_cdf = np.cumsum(np.clip(1 - loads, 0, None))
+        self._healthy = healthy
             
     async def get_status(self) -> Dict[str, Any]:
         """Get current load balancer status"""
         return {
             "total_nodes": len(self.nodes),
-            "healthy_nodes": len([n for n in self.nodes if n.healthy]),
+            "healthy_nodes": len(self._healthy),
             "algorithm": self.config.algorithm,
             "metrics": await self.metrics.get_metrics("lb.*")
         } 
\ No newline at end of file
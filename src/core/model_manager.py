@@ -1,5 +1,6 @@
 import asyncio
-from typing import Dict, Optional
+import heapq
+from typing import Any, Dict, List, Optional, Tuple
 import time
 from .base_models import EdgeTPUModel, CPUModel
 
@@ -22,6 +23,9 @@ class ModelManager:
         )
         
         self.model_usage_times: Dict[str, float] = {}
+        # (last_used, model_type), oldest first; entries superseded by a later
+        # use are skipped when popped
+        self._usage_heap: List[Tuple[float, str]] = []
         self.loaded_shards: Dict[str, Any] = {}
         
     async def load_model_shard(self, model_type: str):
@@ -31,19 +35,32 @@ class ModelManager:
                 model = self._get_model_by_type(model_type)
                 shard = await self._load_shard(model)
                 self.loaded_shards[model_type] = shard
-                self.model_usage_times[model_type] = time.time()
             except Exception as e:
                 raise RuntimeError(f"Failed to load model shard: {e}")
+        self._touch(model_type)
         return self.loaded_shards[model_type]
     
     def unload_inactive_models(self, threshold_minutes: int = 30):
         """Unload models that haven't been used recently"""
-        current_time = time.time()
-        for model_type, last_used in self.model_usage_times.items():
-            if (current_time - last_used) / 60 > threshold_minutes:
-                if model_type in self.loaded_shards:
-                    del self.loaded_shards[model_type]
-                    
+        cutoff = time.time() - threshold_minutes * 60
+        while self._usage_heap and self._usage_heap[0][0] < cutoff:
+            last_used, model_type = heapq.heappop(self._usage_heap)
+            if self.model_usage_times.get(model_type) != last_used:
+                continue  # Used again since this entry was pushed
+            del self.model_usage_times[model_type]
+            self.loaded_shards.pop(model_type, None)
+            
+    def _touch(self, model_type: str):
+        """Record a use of a model"""
+        now = time.time()
+        self.model_usage_times[model_type] = now
+        heapq.heappush(self._usage_heap, (now, model_type))
+        
+        # Drop superseded entries once they dominate the heap
+        if len(self._usage_heap) > 4 * len(self.model_usage_times) + 64:
+            self._usage_heap = [(t, m) for m, t in self.model_usage_times.items()]
+            heapq.heapify(self._usage_heap)
+            
     async def _load_shard(self, model: Any):
         """Helper method to load model shard"""
         # Implement model-specific shard loading logic
@@ -1,22 +1,45 @@
-from typing import Optional, Dict, Any
+from typing import Callable, Optional, Dict, Any
 import asyncio
+import multiprocessing
+import os
 from aiohttp import web
 import logging
 import numpy as np
+import orjson
 from src.core.base_models import BaseModel
 from src.core.resource_manager import ResourceManager, ResourceLimits
 
 logger = logging.getLogger(__name__)
 
+def _encode_default(obj: Any) -> Any:
+    """Fall back to lists for arrays orjson cannot serialize directly"""
+    if isinstance(obj, (np.ndarray, np.generic)):
+        return obj.tolist()
+    raise TypeError
+
+def _decode_input(body: bytes) -> np.ndarray:
+    """Parse a JSON request body into the input array"""
+    return np.array(orjson.loads(body)["input"])
+
+def _encode_result(result: np.ndarray) -> bytes:
+    """Serialize an inference result as a JSON response body"""
+    return orjson.dumps(
+        {"result": result},
+        option=orjson.OPT_SERIALIZE_NUMPY,
+        default=_encode_default
+    )
+
 class ModelService:
     def __init__(self, 
                  model: BaseModel,
                  host: str = "localhost",
                  port: int = 8000,
-                 resource_limits: Optional[ResourceLimits] = None):
+                 resource_limits: Optional[ResourceLimits] = None,
+                 reuse_port: bool = False):
         self.model = model
         self.host = host
         self.port = port
+        self.reuse_port = reuse_port  # Let several worker processes bind the same port
         self.resource_manager = ResourceManager(resource_limits)
         self.app = web.Application()
         self.setup_routes()
@@ -24,6 +47,8 @@ class ModelService:
     def setup_routes(self):
         self.app.router.add_get("/health", self.health_check)
         self.app.router.add_post("/infer", self.inference)
+        self.app.router.add_post("/infer_q", self.inference_quantized)
+        self.app.router.add_post("/infer_raw", self.inference_raw)
         self.app.router.add_get("/metrics", self.get_metrics)
         
     async def health_check(self, request: web.Request) -> web.Response:
@@ -33,15 +58,17 @@ class ModelService:
         
         return web.json_response({
             "status": "healthy" if resources["is_healthy"] else "degraded",
-            "load": metrics.get("avg_time", 0) * self.model.total_inferences,
+            "load": metrics.get("avg_time", 0) * metrics.get("total_inferences", 0),
             "resources": resources
         })
         
     async def inference(self, request: web.Request) -> web.Response:
         """Inference endpoint with resource management"""
         try:
-            data = await request.json()
-            input_data = np.array(data["input"])
+            body = await request.read()
+            thread_pool = self.resource_manager.get_thread_pool()
+            loop = asyncio.get_running_loop()
+            input_data = await loop.run_in_executor(thread_pool, _decode_input, body)
             
             # Check resource availability
             batch_size = input_data.shape[0] if len(input_data.shape) > 1 else 1
@@ -54,14 +81,9 @@ class ModelService:
             # Get connection from pool
             conn = await self.resource_manager.acquire_connection()
             try:
-                # Use thread pool for CPU-bound operations
-                thread_pool = self.resource_manager.get_thread_pool()
-                result = await asyncio.get_event_loop().run_in_executor(
-                    thread_pool,
-                    self.model.infer,
-                    input_data
-                )
-                return web.json_response({"result": result.tolist()})
+                result = await self.model.infer(input_data)
+                payload = await loop.run_in_executor(thread_pool, _encode_result, result)
+                return web.Response(body=payload, content_type="application/json")
             finally:
                 await self.resource_manager.release_connection(conn)
                 
@@ -72,6 +94,75 @@ class ModelService:
                 status=500
             )
             
+    async def inference_quantized(self, request: web.Request) -> web.Response:
+        """Inference on raw int8 tensors, for quantized models.
+        
+        The body is a row-major int8 array of shape (batch, dim), with dim given
+        by the ``dim`` query parameter. The response body is the raw output
+        tensor, described by the X-Dtype and X-Shape headers.
+        """
+        infer = getattr(self.model, "infer_quantized", None)
+        return await self._raw_inference(request, np.dtype(np.int8), infer)
+        
+    async def inference_raw(self, request: web.Request) -> web.Response:
+        """Inference on raw little-endian float32 tensors, skipping JSON.
+        
+        Same layout as /infer_q: a (batch, dim) body with dim in the query
+        string, answered with the raw output tensor and X-Dtype/X-Shape headers.
+        """
+        return await self._raw_inference(request, np.dtype("<f4"))
+        
+    async def _raw_inference(self,
+                             request: web.Request,
+                             dtype: np.dtype,
+                             infer: Optional[Callable] = None) -> web.Response:
+        """Serve a binary tensor request; the Content-Length must match whole rows"""
+        try:
+            dim = int(request.query["dim"])
+            nbytes = request.content_length
+            row_bytes = dim * dtype.itemsize
+            if dim <= 0 or not nbytes or nbytes % row_bytes:
+                return web.json_response(
+                    {"error": f"Body of {nbytes} bytes is not a whole number of rows of {dim} {dtype.name}"},
+                    status=400
+                )
+            raw = await request.content.readexactly(nbytes)
+            input_data = np.frombuffer(raw, dtype=dtype).reshape(-1, dim)
+            
+            batch_size = input_data.shape[0]
+            if not await self.resource_manager.can_accept_batch(batch_size):
+                return web.json_response(
+                    {"error": "System overloaded, try again later"},
+                    status=503
+                )
+                
+            conn = await self.resource_manager.acquire_connection()
+            try:
+                if infer is not None:
+                    result = await infer(input_data)
+                else:
+                    result = await self.model.infer(input_data)
+                result = np.ascontiguousarray(result)
+                return web.Response(
+                    body=result.tobytes(),
+                    content_type="application/octet-stream",
+                    headers={
+                        "X-Dtype": result.dtype.str,
+                        "X-Shape": ",".join(map(str, result.shape))
+                    }
+                )
+            finally:
+                await self.resource_manager.release_connection(conn)
+                
+        except (KeyError, ValueError, asyncio.IncompleteReadError) as e:
+            return web.json_response({"error": f"Invalid tensor request: {e}"}, status=400)
+        except Exception as e:
+            logger.error(f"Raw inference error: {e}")
+            return web.json_response(
+                {"error": str(e)},
+                status=500
+            )
+            
     async def get_metrics(self, request: web.Request) -> web.Response:
         """Get all metrics including resource usage"""
         metrics = await self.model.get_performance_metrics()
@@ -87,6 +178,41 @@ class ModelService:
         await self.resource_manager.start()
         runner = web.AppRunner(self.app)
         await runner.setup()
-        site = web.TCPSite(runner, self.host, self.port)
+        site = web.TCPSite(runner, self.host, self.port, reuse_port=self.reuse_port or None)
         await site.start()
-        logger.info(f"Model service started at http://{self.host}:{self.port}") 
\ No newline at end of file
+        logger.info(f"Model service started at http://{self.host}:{self.port}")
+
+def run_workers(model_factory: Callable[[], BaseModel],
+                workers: Optional[int] = None,
+                **service_kwargs):
+    """Serve from several processes sharing one port through SO_REUSEPORT.
+    
+    Each worker builds its own model and service, so model_factory must be
+    picklable (a module-level function). The kernel spreads incoming
+    connections across the workers' accept queues.
+    """
+    workers = workers or os.cpu_count() or 1
+    processes = [
+        multiprocessing.Process(target=_serve_worker, args=(model_factory, service_kwargs))
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+def _serve_worker(model_factory: Callable[[], BaseModel], service_kwargs: Dict[str, Any]):
+    async def serve():
+        service = ModelService(model_factory(), reuse_port=True, **service_kwargs)
+        await service.start()
+        await asyncio.Event().wait()
+        
+    # uvloop's libuv loop does fewer syscalls per accept/read/write than the
+    # selector loop; fall back to the default loop where it isn't installed
+    try:
+        import uvloop
+        loop_factory = uvloop.new_event_loop
+    except ImportError:
+        loop_factory = asyncio.new_event_loop
+    with asyncio.Runner(loop_factory=loop_factory) as runner:
+        runner.run(serve()) 
\ No newline at end of file
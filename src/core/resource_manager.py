@@ -1,11 +1,14 @@
-from typing import Dict, Optional, Any, List
+from typing import Deque, Dict, Optional, Any, List
 import asyncio
+import os
+import sys
 import psutil
 import logging
 from dataclasses import dataclass
 import time
 from concurrent.futures import ThreadPoolExecutor
 import threading
+from collections import deque
 from src.monitoring.metrics import MetricsCollector
 
 logger = logging.getLogger(__name__)
@@ -15,50 +18,95 @@ class ResourceLimits:
     max_memory_percent: float = 80.0
     max_cpu_percent: float = 90.0
     max_connections: int = 100
-    max_threads: int = 32
+    max_threads: int = min(32, os.cpu_count() or 1)
     connection_timeout: float = 30.0
     max_batch_size: int = 64
 
+def _init_worker():
+    """Keep each pool thread's math libraries single-threaded.
+    
+    The pool already runs one inference per core; letting torch/OpenMP/MKL
+    start their own intra-op threads in every worker oversubscribes the CPU
+    and costs far more throughput than it gains on small models.
+    """
+    os.environ["OMP_NUM_THREADS"] = "1"
+    os.environ["MKL_NUM_THREADS"] = "1"
+    torch = sys.modules.get("torch")  # Only if a model has already loaded it
+    if torch is not None:
+        torch.set_num_threads(1)
+
 class ConnectionPool:
     """Manages a pool of reusable connections"""
     
     def __init__(self, max_size: int, timeout: float):
         self.max_size = max_size
         self.timeout = timeout
-        self._available = asyncio.Queue()
+        self._idle: Deque[Any] = deque()
+        self._waiters: Deque[asyncio.Future] = deque()
         self._in_use = set()
-        self._lock = asyncio.Lock()
+        self._opening = 0  # Connections being created, counted against max_size
         
     async def acquire(self):
         """Acquire a connection from the pool"""
+        # Most recently released connections first, they are the warmest
+        while self._idle:
+            conn = self._idle.pop()
+            if self._validate_connection(conn):
+                self._in_use.add(conn)
+                return conn
+            await self._close_connection(conn)
+            
+        if len(self._in_use) + self._opening < self.max_size:
+            self._opening += 1
+            try:
+                conn = await self._create_connection()
+            finally:
+                self._opening -= 1
+            self._in_use.add(conn)
+            return conn
+            
+        # At capacity: wait for release() to hand a connection over directly
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
         try:
-            # Try to get an available connection
-            async with asyncio.timeout(self.timeout):
-                while True:
-                    try:
-                        conn = await self._available.get()
-                        if self._validate_connection(conn):
-                            self._in_use.add(conn)
-                            return conn
-                    except asyncio.QueueEmpty:
-                        if len(self._in_use) < self.max_size:
-                            # Create new connection if under limit
-                            conn = await self._create_connection()
-                            self._in_use.add(conn)
-                            return conn
-                        # Wait for available connection
-                        await asyncio.sleep(0.1)
-        except TimeoutError:
+            return await asyncio.wait_for(waiter, self.timeout)
+        except asyncio.TimeoutError:
             raise ConnectionError("Connection pool timeout")
+        finally:
+            if not waiter.done():
+                waiter.cancel()
+            if waiter.cancelled():
+                # Drop it now rather than leaving release() to skip it later
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    pass
             
     async def release(self, conn):
         """Release a connection back to the pool"""
-        self._in_use.remove(conn)
-        if self._validate_connection(conn):
-            await self._available.put(conn)
-        else:
+        self._in_use.discard(conn)
+        if not self._validate_connection(conn):
             await self._close_connection(conn)
-            
+            conn = await self._create_connection() if self._has_waiters() else None
+            if conn is None:
+                return
+                
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self._in_use.add(conn)
+                waiter.set_result(conn)
+                return
+        self._idle.append(conn)
+        
+    @property
+    def idle_count(self) -> int:
+        """Number of connections waiting in the pool"""
+        return len(self._idle)
+        
+    def _has_waiters(self) -> bool:
+        return any(not waiter.done() for waiter in self._waiters)
+        
     def _validate_connection(self, conn) -> bool:
         """Validate if connection is still usable"""
         return True  # Implement actual validation logic
@@ -81,9 +129,18 @@ class ResourceManager:
             self.limits.max_connections,
             self.limits.connection_timeout
         )
-        self._thread_pool = ThreadPoolExecutor(max_workers=self.limits.max_threads)
+        self._thread_pool = ThreadPoolExecutor(
+            max_workers=self.limits.max_threads,
+            initializer=_init_worker
+        )
         self._monitor_task: Optional[asyncio.Task] = None
         
+        # psutil samples are shared for sample_ttl seconds; the monitor loop
+        # keeps them fresh so request handlers rarely hit psutil themselves
+        self.sample_ttl = 1.0
+        self._cached_metrics: Dict[str, float] = {}
+        self._cached_at = float('-inf')
+        
     async def start(self):
         """Start resource monitoring"""
         self._monitor_task = asyncio.create_task(self._monitor_resources())
@@ -98,17 +155,27 @@ class ResourceManager:
         
     async def check_resources(self) -> Dict[str, Any]:
         """Check current resource usage"""
-        cpu_percent = psutil.cpu_percent()
-        memory = psutil.virtual_memory()
+        if time.monotonic() - self._cached_at >= self.sample_ttl:
+            self._sample_resources()
+        cpu_percent = self._cached_metrics["cpu_percent"]
+        memory_percent = self._cached_metrics["memory_percent"]
         
         return {
             "cpu_percent": cpu_percent,
-            "memory_percent": memory.percent,
-            "available_connections": self._connection_pool._available.qsize(),
+            "memory_percent": memory_percent,
+            "available_connections": self._connection_pool.idle_count,
             "active_connections": len(self._connection_pool._in_use),
-            "active_threads": len(threading.enumerate()),
-            "is_healthy": self._check_health(cpu_percent, memory.percent)
+            "active_threads": threading.active_count(),
+            "is_healthy": self._check_health(cpu_percent, memory_percent)
+        }
+        
+    def _sample_resources(self):
+        """Read CPU and memory usage from psutil into the cache"""
+        self._cached_metrics = {
+            "cpu_percent": psutil.cpu_percent(),
+            "memory_percent": psutil.virtual_memory().percent
         }
+        self._cached_at = time.monotonic()
         
     def _check_health(self, cpu_percent: float, memory_percent: float) -> bool:
         """Check if resource usage is within limits"""
@@ -131,12 +198,18 @@ class ResourceManager:
         
     async def _monitor_resources(self):
         """Continuous resource monitoring loop"""
+        last_report = float('-inf')
         while True:
             try:
+                self._sample_resources()
+                if self._cached_at - last_report < 5:  # Report every 5 seconds
+                    await asyncio.sleep(self.sample_ttl)
+                    continue
+                last_report = self._cached_at
                 metrics = await self.check_resources()
                 
                 # Record metrics
-                await self.metrics.record_metrics("resource_usage", {
+                self.metrics.record_nowait("resource_usage", {
                     "cpu_percent": metrics["cpu_percent"],
                     "memory_percent": metrics["memory_percent"],
                     "active_connections": metrics["active_connections"],
@@ -149,7 +222,7 @@ class ResourceManager:
                 if metrics["memory_percent"] > self.limits.max_memory_percent * 0.8:
                     logger.warning(f"High memory usage: {metrics['memory_percent']}%")
                     
-                await asyncio.sleep(5)  # Check every 5 seconds
+                await asyncio.sleep(self.sample_ttl)
                 
             except asyncio.CancelledError:
                 break
@@ -162,9 +235,12 @@ class ResourceManager:
         if batch_size > self.limits.max_batch_size:
             return False
             
-        metrics = await self.check_resources()
+        if time.monotonic() - self._cached_at >= self.sample_ttl:
+            self._sample_resources()
+        cpu_percent = self._cached_metrics["cpu_percent"]
+        memory_percent = self._cached_metrics["memory_percent"]
         return (
-            metrics["is_healthy"] and
-            metrics["cpu_percent"] < self.limits.max_cpu_percent * 0.9 and
-            metrics["memory_percent"] < self.limits.max_memory_percent * 0.9
+            self._check_health(cpu_percent, memory_percent) and
+            cpu_percent < self.limits.max_cpu_percent * 0.9 and
+            memory_percent < self.limits.max_memory_percent * 0.9
         ) 
\ No newline at end of file
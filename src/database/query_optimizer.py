@@ -1,13 +1,54 @@
-from typing import Dict, Any, List, Optional, Set
+from typing import Dict, Any, List, Optional, Set, Tuple
 import logging
 import time
 from dataclasses import dataclass
 import asyncio
-from collections import OrderedDict
+import pickle
+from functools import lru_cache
+from cachetools import TTLCache
+import xxhash
+import sqlglot
+from sqlglot import exp
 from src.monitoring.metrics import MetricsCollector
 
 logger = logging.getLogger(__name__)
 
+# Encoded query text, reused across calls with the same statement
+_query_bytes: Dict[str, bytes] = {}
+_QUERY_BYTES_LIMIT = 4096
+
+def query_key(query: str, params: Optional[Dict] = None) -> int:
+    """Stable cache key for a query and its parameters"""
+    query_bytes = _query_bytes.get(query)
+    if query_bytes is None:
+        if len(_query_bytes) >= _QUERY_BYTES_LIMIT:
+            _query_bytes.clear()
+        query_bytes = _query_bytes[query] = query.encode()
+    params_bytes = pickle.dumps(params, protocol=5) if params is not None else b""
+    return xxhash.xxh3_64_intdigest(query_bytes + b"\x00" + params_bytes)
+
+@lru_cache(maxsize=4096)
+def _where_columns(query: str) -> Dict[str, Tuple[str, ...]]:
+    """Parse a query and collect the columns its WHERE clauses filter on, per table"""
+    try:
+        tree = sqlglot.parse_one(query)
+    except sqlglot.errors.SqlglotError:
+        return {}
+    if tree is None:
+        return {}
+        
+    tables = {table.alias_or_name: table.name for table in tree.find_all(exp.Table)}
+    # Unqualified columns can only be attributed when one table is involved
+    default_table = next(iter(tables.values())) if len(tables) == 1 else None
+    
+    columns: Dict[str, Dict[str, None]] = {}
+    for where in tree.find_all(exp.Where):
+        for column in where.find_all(exp.Column):
+            table = tables.get(column.table) if column.table else default_table
+            if table:
+                columns.setdefault(table, {})[column.name] = None
+    return {table: tuple(names) for table, names in columns.items()}
+
 @dataclass
 class QueryStats:
     """Statistics for a single query"""
@@ -30,33 +71,21 @@ class QueryCache:
     
     def __init__(self, config: QueryCacheConfig):
         self.config = config
-        self._cache = OrderedDict()
+        # TTLCache drops expired entries and evicts least recently used ones
+        self._cache = TTLCache(maxsize=config.max_size, ttl=config.ttl)
         self._stats: Dict[str, QueryStats] = {}
         
     async def get(self, query_hash: str) -> Optional[Any]:
         """Get cached query result"""
         if not self.config.enabled:
             return None
-            
-        if query_hash in self._cache:
-            result, timestamp = self._cache[query_hash]
-            if time.time() - timestamp <= self.config.ttl:
-                # Move to end (most recently used)
-                self._cache.move_to_end(query_hash)
-                return result
-            else:
-                # Expired
-                del self._cache[query_hash]
-        return None
+        return self._cache.get(query_hash)
         
     async def set(self, query_hash: str, result: Any, execution_time: float):
         """Cache query result if it meets criteria"""
         if not self.config.enabled or execution_time < self.config.min_exec_time:
             return
-            
-        self._cache[query_hash] = (result, time.time())
-        if len(self._cache) > self.config.max_size:
-            self._cache.popitem(first=True)  # Remove oldest
+        self._cache[query_hash] = result
 
 class QueryOptimizer:
     """Optimizes database queries for better performance"""
@@ -68,6 +97,9 @@ class QueryOptimizer:
         self._query_stats: Dict[str, QueryStats] = {}
         self._table_stats: Dict[str, Dict[str, Any]] = {}
         self._suggested_indexes: Set[str] = set()
+        # Anti-pattern warnings repeat for every matching query; log 1 in N
+        self.warning_sample_rate = 1000
+        self._warning_counts: Dict[str, int] = {}  # message -> times seen
         
     async def analyze_query(self, query: str, params: Optional[Dict] = None) -> str:
         """Analyze and optimize a query"""
@@ -79,19 +111,26 @@ class QueryOptimizer:
         
         # Check for common anti-patterns
         if "select *" in query_lower:
-            logger.warning("Consider specifying columns instead of SELECT *")
+            self._sampled_warning("Consider specifying columns instead of SELECT *")
             
         if "like '%..." in query_lower:
-            logger.warning("Leading wildcard LIKE patterns prevent index usage")
+            self._sampled_warning("Leading wildcard LIKE patterns prevent index usage")
             
         if " or " in query_lower:
-            logger.warning("OR conditions might prevent index usage")
+            self._sampled_warning("OR conditions might prevent index usage")
             
         # Suggest indexes based on WHERE clauses
         await self._analyze_for_indexes(query)
         
         return query
         
+    def _sampled_warning(self, message: str):
+        """Log the first of every warning_sample_rate occurrences of a warning"""
+        count = self._warning_counts.get(message, 0) + 1
+        self._warning_counts[message] = count
+        if (count - 1) % self.warning_sample_rate == 0 and logger.isEnabledFor(logging.WARNING):
+            logger.warning(message)
+            
     async def record_execution(self, query_hash: str, execution_time: float, rows_affected: int):
         """Record query execution statistics"""
         if query_hash not in self._query_stats:
@@ -105,14 +144,14 @@ class QueryOptimizer:
         stats.rows_affected = rows_affected
         
         # Record metrics
-        await self.metrics.record_metrics("query_performance", {
+        self.metrics.record_nowait("query_performance", {
             "execution_time": execution_time,
             "rows_affected": rows_affected
         })
         
         # Check for slow queries
         if execution_time > self._slow_query_threshold:
-            logger.warning(f"Slow query detected (took {execution_time:.2f}s): {query_hash}")
+            logger.warning("Slow query detected (took %.2fs): %s", execution_time, query_hash)
             
     async def _analyze_for_indexes(self, query: str):
         """Analyze query for potential index improvements"""
@@ -124,13 +163,12 @@ class QueryOptimizer:
                 index_name = f"idx_{table}_{column}"
                 if index_name not in self._suggested_indexes:
                     self._suggested_indexes.add(index_name)
-                    logger.info(f"Suggested index: CREATE INDEX {index_name} ON {table}({column})")
+                    logger.info("Suggested index: CREATE INDEX %s ON %s(%s)", index_name, table, column)
                     
     def _extract_where_columns(self, query: str) -> Dict[str, List[str]]:
         """Extract table and column names from WHERE clauses"""
-        # Implement actual SQL parsing here
-        # This is a simplified example
-        return {}
+        # Parses are cached per query text; ORM-generated SQL repeats the same templates
+        return {table: list(columns) for table, columns in _where_columns(query).items()}
         
     async def get_optimization_report(self) -> Dict[str, Any]:
         """Generate query optimization report"""
@@ -1,12 +1,13 @@
 from typing import Dict, Any, List, Optional
 import asyncio
 import sqlalchemy as sa
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_scoped_session, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from datetime import datetime
 import logging
 import time
-from .query_optimizer import QueryOptimizer
+from .query_optimizer import QueryOptimizer, query_key
+from ..monitoring.metrics import MetricsTracker
 
 logger = logging.getLogger(__name__)
 
@@ -43,6 +44,11 @@ class Operation(Base):
     version = sa.Column(sa.Integer)
     commit_hash = sa.Column(sa.String, nullable=True)
 
+# Column order for COPY into operations; timestamp must stay last
+_COPY_OPERATION_COLUMNS = (
+    'type', 'path', 'content', 'position', 'user_id', 'version', 'commit_hash', 'timestamp'
+)
+
 class Conflict(Base):
     __tablename__ = 'conflicts'
     
@@ -65,9 +71,28 @@ class Metric(Base):
     id = sa.Column(sa.Integer, primary_key=True, autoincrement=True)
     name = sa.Column(sa.String)
     value = sa.Column(sa.Float)
-    metadata = sa.Column(sa.JSON)
+    # "metadata" is reserved on declarative classes
+    metadata_ = sa.Column('metadata', sa.JSON)
     timestamp = sa.Column(sa.DateTime, default=datetime.utcnow)
 
+# Read queries built once; values are bound per call
+_STMT_USER_OPS = sa.select(Operation)\
+    .where(Operation.user_id == sa.bindparam("user_id"))\
+    .order_by(Operation.timestamp.desc())\
+    .limit(sa.bindparam("limit"))
+
+_STMT_FILE_OPS = sa.select(Operation)\
+    .where(Operation.path == sa.bindparam("path"))\
+    .order_by(Operation.timestamp.desc())\
+    .limit(sa.bindparam("limit"))
+
+_STMT_UNRESOLVED_CONFLICTS = sa.select(Conflict)\
+    .where(Conflict.resolved == False)
+
+_STMT_TOUCH_USER = sa.update(User.__table__)\
+    .where(User.__table__.c.id == sa.bindparam("uid"))\
+    .values(last_active=sa.bindparam("ts"))
+
 class DatabaseManager:
     def __init__(self, connection_url: str):
         self.engine = create_async_engine(connection_url)
@@ -76,9 +101,19 @@ class DatabaseManager:
             class_=AsyncSession,
             expire_on_commit=False
         )
+        # One session per task, so a task's queries share a connection
+        self.scoped_session = async_scoped_session(
+            self.SessionLocal,
+            scopefunc=asyncio.current_task
+        )
         self.metrics = MetricsTracker()
         self.query_optimizer = QueryOptimizer()
         
+        # last_active writes are coalesced per user and flushed together
+        self.activity_flush_interval = 1.0
+        self._pending_activity: Dict[str, datetime] = {}
+        self._activity_task: Optional[asyncio.Task] = None
+        
     async def init_db(self):
         """Initialize database schema"""
         try:
@@ -103,7 +138,7 @@ class DatabaseManager:
                              commit_hash: Optional[str] = None) -> Operation:
         """Record a new operation"""
         try:
-            async with self.get_session() as session:
+            async with self.SessionLocal() as session:
                 operation = Operation(
                     type=operation_type,
                     path=path,
@@ -121,23 +156,57 @@ class DatabaseManager:
             self.metrics.record_error('db_operation_error', str(e))
             raise
             
+    async def record_operations_bulk(self, operations: List[Dict[str, Any]]):
+        """Record many operations in a single executemany insert"""
+        if not operations:
+            return
+            
+        try:
+            if self.engine.dialect.driver == 'asyncpg':
+                await self._copy_operations(operations)
+                return
+                
+            async with self.SessionLocal() as session:
+                await session.execute(sa.insert(Operation), operations)
+                await session.commit()
+                
+        except Exception as e:
+            self.metrics.record_error('db_operation_error', str(e))
+            raise
+            
+    async def _copy_operations(self, operations: List[Dict[str, Any]]):
+        """Stream operation rows to PostgreSQL with COPY instead of INSERTs"""
+        # COPY skips column defaults applied by SQLAlchemy, so fill them in here
+        now = datetime.utcnow()
+        records = [
+            tuple(op.get(column) for column in _COPY_OPERATION_COLUMNS[:-1]) + (now,)
+            for op in operations
+        ]
+        async with self.engine.connect() as conn:
+            raw = await conn.get_raw_connection()
+            await raw.driver_connection.copy_records_to_table(
+                Operation.__tablename__,
+                records=records,
+                columns=_COPY_OPERATION_COLUMNS
+            )
+            await conn.commit()
+            
     async def record_conflict(self, 
                             path: str,
                             operations: List[int]) -> Conflict:
         """Record a new conflict"""
         try:
-            async with self.get_session() as session:
+            async with self.SessionLocal() as session:
                 conflict = Conflict(path=path)
                 session.add(conflict)
                 await session.flush()
                 
                 # Link operations to conflict
-                for op_id in operations:
-                    conflict_op = ConflictOperation(
-                        conflict_id=conflict.id,
-                        operation_id=op_id
+                if operations:
+                    await session.execute(
+                        sa.insert(ConflictOperation.__table__),
+                        [{"conflict_id": conflict.id, "operation_id": op_id} for op_id in operations]
                     )
-                    session.add(conflict_op)
                     
                 await session.commit()
                 return conflict
@@ -148,28 +217,47 @@ class DatabaseManager:
             
     async def update_user_activity(self, user_id: str):
         """Update user's last active timestamp"""
+        self._pending_activity[user_id] = datetime.utcnow()
+        if self._activity_task is None or self._activity_task.done():
+            self._activity_task = asyncio.create_task(self._flush_user_activity_later())
+            
+    async def flush_user_activity(self):
+        """Write all pending last_active timestamps in one batch"""
+        if not self._pending_activity:
+            return
+            
+        pending, self._pending_activity = self._pending_activity, {}
         try:
-            async with self.get_session() as session:
-                user = await session.get(User, user_id)
-                if user:
-                    user.last_active = datetime.utcnow()
-                    await session.commit()
-                    
+            session = self.scoped_session()
+            try:
+                await session.execute(_STMT_TOUCH_USER, [
+                    {"uid": user_id, "ts": last_active}
+                    for user_id, last_active in pending.items()
+                ])
+                await session.commit()
+            finally:
+                await self.scoped_session.remove()
+                
         except Exception as e:
             self.metrics.record_error('db_user_update_error', str(e))
+            # Retry on the next flush; timestamps set meanwhile are newer and win
+            self._pending_activity = {**pending, **self._pending_activity}
             
+    async def _flush_user_activity_later(self):
+        # Keep going while updates arrive during a flush, so none are left unwritten
+        while self._pending_activity:
+            await asyncio.sleep(self.activity_flush_interval)
+            await self.flush_user_activity()
+        
     async def get_user_operations(self, 
                                 user_id: str,
                                 limit: int = 100) -> List[Operation]:
         """Get recent operations for a user"""
         try:
-            async with self.get_session() as session:
-                query = sa.select(Operation)\
-                    .where(Operation.user_id == user_id)\
-                    .order_by(Operation.timestamp.desc())\
-                    .limit(limit)
-                    
-                result = await session.execute(query)
+            async with self.SessionLocal() as session:
+                result = await session.execute(
+                    _STMT_USER_OPS, {"user_id": user_id, "limit": limit}
+                )
                 return result.scalars().all()
                 
         except Exception as e:
@@ -181,13 +269,10 @@ class DatabaseManager:
                                 limit: int = 100) -> List[Operation]:
         """Get recent operations for a file"""
         try:
-            async with self.get_session() as session:
-                query = sa.select(Operation)\
-                    .where(Operation.path == path)\
-                    .order_by(Operation.timestamp.desc())\
-                    .limit(limit)
-                    
-                result = await session.execute(query)
+            async with self.SessionLocal() as session:
+                result = await session.execute(
+                    _STMT_FILE_OPS, {"path": path, "limit": limit}
+                )
                 return result.scalars().all()
                 
         except Exception as e:
@@ -197,11 +282,8 @@ class DatabaseManager:
     async def get_unresolved_conflicts(self) -> List[Conflict]:
         """Get all unresolved conflicts"""
         try:
-            async with self.get_session() as session:
-                query = sa.select(Conflict)\
-                    .where(Conflict.resolved == False)
-                    
-                result = await session.execute(query)
+            async with self.SessionLocal() as session:
+                result = await session.execute(_STMT_UNRESOLVED_CONFLICTS)
                 return result.scalars().all()
                 
         except Exception as e:
@@ -213,7 +295,7 @@ class DatabaseManager:
         start_time = time.time()
         
         # Generate query hash for caching
-        query_hash = hash(f"{query}:{str(params)}")
+        query_hash = query_key(query, params)
         
         # Check cache
         cached_result = await self.query_optimizer.cache.get(query_hash)
@@ -1,13 +1,14 @@
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
+import asyncio
 import logging
 from pathlib import Path
 import yaml
-import markdown
-import json
+import mistune
+import orjson
 from dataclasses import dataclass
 from fastapi.staticfiles import StaticFiles
 from fastapi import FastAPI
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import Environment, FileSystemLoader, Template
 
 logger = logging.getLogger(__name__)
 
@@ -32,15 +33,26 @@ class DocumentationManager:
         self.template_env = Environment(
             loader=FileSystemLoader(self.config.template_dir)
         )
+        self._markdown = mistune.create_markdown(
+            escape=False,
+            plugins=["table", "strikethrough"]
+        )
+        # Markdown path -> (mtime_ns, rendered HTML)
+        self._markdown_cache: Dict[Path, Tuple[int, str]] = {}
+        # Template name -> (sections it was last rendered with, template, output)
+        self._page_cache: Dict[str, Tuple[Tuple[Tuple[str, str], ...], Template, str]] = {}
         
     async def generate_all_docs(self):
         """Generate all documentation"""
+        # Each generator writes its own directory, so they can run together
+        tasks = []
         if self.config.enable_api_docs:
-            await self.generate_api_docs()
+            tasks.append(self.generate_api_docs())
         if self.config.enable_user_docs:
-            await self.generate_user_docs()
+            tasks.append(self.generate_user_docs())
         if self.config.enable_dev_docs:
-            await self.generate_dev_docs()
+            tasks.append(self.generate_dev_docs())
+        await asyncio.gather(*tasks)
             
     async def generate_api_docs(self):
         """Generate API documentation"""
@@ -58,51 +70,58 @@ class DocumentationManager:
         # Save OpenAPI spec
         api_docs_path = self.docs_path / "api"
         api_docs_path.mkdir(parents=True, exist_ok=True)
-        with open(api_docs_path / "openapi.json", "w") as f:
-            json.dump(api_spec, f, indent=2)
+        await asyncio.to_thread(
+            (api_docs_path / "openapi.json").write_bytes,
+            orjson.dumps(api_spec, option=orjson.OPT_INDENT_2)
+        )
             
     async def generate_user_docs(self):
         """Generate user documentation"""
-        user_docs = {
-            "getting_started": self._render_markdown("getting_started.md"),
-            "features": self._render_markdown("features.md"),
-            "tutorials": self._render_markdown("tutorials.md"),
-            "faq": self._render_markdown("faq.md")
-        }
-        
-        # Render user documentation
-        template = self.template_env.get_template("user_docs.html")
-        output = template.render(docs=user_docs)
-        
-        user_docs_path = self.docs_path / "user"
-        user_docs_path.mkdir(parents=True, exist_ok=True)
-        with open(user_docs_path / "index.html", "w") as f:
-            f.write(output)
+        await asyncio.to_thread(self._write_docs_page, "user_docs.html", self.docs_path / "user", {
+            "getting_started": "getting_started.md",
+            "features": "features.md",
+            "tutorials": "tutorials.md",
+            "faq": "faq.md"
+        })
             
     async def generate_dev_docs(self):
         """Generate developer documentation"""
-        dev_docs = {
-            "architecture": self._render_markdown("architecture.md"),
-            "api_reference": self._render_markdown("api_reference.md"),
-            "contributing": self._render_markdown("contributing.md"),
-            "deployment": self._render_markdown("deployment.md")
-        }
+        await asyncio.to_thread(self._write_docs_page, "dev_docs.html", self.docs_path / "dev", {
+            "architecture": "architecture.md",
+            "api_reference": "api_reference.md",
+            "contributing": "contributing.md",
+            "deployment": "deployment.md"
+        })
         
-        # Render developer documentation
-        template = self.template_env.get_template("dev_docs.html")
-        output = template.render(docs=dev_docs)
+    def _write_docs_page(self, template_name: str, output_path: Path, sections: Dict[str, str]):
+        """Render markdown sections into a template and write it as the page's index.html"""
+        docs = {name: self._render_markdown(filename) for name, filename in sections.items()}
         
-        dev_docs_path = self.docs_path / "dev"
-        dev_docs_path.mkdir(parents=True, exist_ok=True)
-        with open(dev_docs_path / "index.html", "w") as f:
-            f.write(output)
+        # Re-render only when a section or the template changed since the last build
+        docs_key = tuple(docs.items())
+        cached = self._page_cache.get(template_name)
+        if cached is not None and cached[0] == docs_key and cached[1].is_up_to_date:
+            output = cached[2]
+        else:
+            template = self.template_env.get_template(template_name)
+            output = template.render(docs=docs)
+            self._page_cache[template_name] = (docs_key, template, output)
+            
+        output_path.mkdir(parents=True, exist_ok=True)
+        (output_path / "index.html").write_text(output)
             
     def _render_markdown(self, filename: str) -> str:
         """Render markdown file to HTML"""
         try:
             md_path = Path(self.config.template_dir) / "markdown" / filename
-            with open(md_path) as f:
-                return markdown.markdown(f.read())
+            mtime = md_path.stat().st_mtime_ns
+            cached = self._markdown_cache.get(md_path)
+            if cached is not None and cached[0] == mtime:
+                return cached[1]
+                
+            html = self._markdown(md_path.read_text())
+            self._markdown_cache[md_path] = (mtime, html)
+            return html
         except Exception as e:
             logger.error(f"Failed to render markdown {filename}: {e}")
             return ""
@@ -1,6 +1,8 @@
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 import ast
-from dataclasses import dataclass
+import hashlib
+from dataclasses import dataclass, replace
+from cachetools import LRUCache
 import networkx as nx
 
 @dataclass
@@ -22,6 +24,8 @@ class CodeAnalyzer:
     def __init__(self):
         self.complexity_threshold = 10
         self.min_comment_ratio = 0.1
+        # blake2b digest of the source -> result of analyzing it as Python
+        self._python_cache: LRUCache = LRUCache(maxsize=512)
         
     async def analyze(self, code: str, language: str) -> AnalysisResult:
         """Analyze code and provide insights"""
@@ -35,16 +39,32 @@ class CodeAnalyzer:
         return await analyzer(code)
         
     async def _analyze_python(self, code: str) -> AnalysisResult:
-        """Analyze Python code"""
+        """Analyze Python code, reusing the result for source seen before"""
+        key = hashlib.blake2b(code.encode(), digest_size=16).digest()
+        result = self._python_cache.get(key)
+        if result is None:
+            result = self._python_cache[key] = self._analyze_python_source(code)
+            
+        # Callers get their own copies of the mutable parts
+        return replace(
+            result,
+            metrics=replace(result.metrics, dependencies=list(result.metrics.dependencies)),
+            suggestions=list(result.suggestions),
+            potential_issues=list(result.potential_issues),
+            dependency_graph=result.dependency_graph.copy()
+        )
+        
+    def _analyze_python_source(self, code: str) -> AnalysisResult:
         tree = ast.parse(code)
+        complexity, dependencies, issues = self._scan(tree)
         
         # Calculate metrics
         metrics = CodeMetrics(
-            complexity=self._calculate_complexity(tree),
+            complexity=complexity,
             maintainability_index=self._calculate_maintainability(tree),
             lines_of_code=len(code.splitlines()),
             comment_ratio=self._calculate_comment_ratio(code),
-            dependencies=self._extract_dependencies(tree)
+            dependencies=dependencies
         )
         
         # Generate suggestions
@@ -60,9 +80,6 @@ class CodeAnalyzer:
         # Build dependency graph
         dep_graph = self._build_dependency_graph(tree)
         
-        # Identify potential issues
-        issues = self._identify_issues(tree, metrics)
-        
         return AnalysisResult(
             metrics=metrics,
             suggestions=suggestions,
@@ -70,17 +87,28 @@ class CodeAnalyzer:
             dependency_graph=dep_graph
         )
         
-    def _calculate_complexity(self, tree: ast.AST) -> int:
-        """Calculate cyclomatic complexity"""
+    def _scan(self, tree: ast.AST) -> Tuple[int, List[str], List[str]]:
+        """Calculate complexity, dependencies and potential issues in one pass"""
         complexity = 1
+        dependencies = set()
+        issues = []
         
         for node in ast.walk(tree):
             if isinstance(node, (ast.If, ast.While, ast.For, ast.ExceptHandler)):
                 complexity += 1
             elif isinstance(node, ast.BoolOp):
                 complexity += len(node.values) - 1
+            elif isinstance(node, ast.Import):
+                dependencies.update(name.name for name in node.names)
+            elif isinstance(node, ast.ImportFrom):
+                dependencies.add(node.module)
+            elif isinstance(node, ast.Try):
+                if not node.handlers:
+                    issues.append("Empty try-except block found")
+            elif isinstance(node, ast.Pass):
+                issues.append("Empty code block found")
                 
-        return complexity
+        return complexity, list(dependencies), issues
         
     def _calculate_maintainability(self, tree: ast.AST) -> float:
         """Calculate maintainability index"""
@@ -93,33 +121,8 @@ class CodeAnalyzer:
         comment_lines = sum(1 for line in lines if line.strip().startswith('#'))
         return comment_lines / len(lines) if lines else 0
         
-    def _extract_dependencies(self, tree: ast.AST) -> List[str]:
-        """Extract external dependencies"""
-        dependencies = []
-        
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Import):
-                dependencies.extend(name.name for name in node.names)
-            elif isinstance(node, ast.ImportFrom):
-                dependencies.append(node.module)
-                
-        return list(set(dependencies))
-        
     def _build_dependency_graph(self, tree: ast.AST) -> nx.DiGraph:
         """Build dependency graph"""
         graph = nx.DiGraph()
         # Implement dependency graph construction
-        return graph
-        
-    def _identify_issues(self, tree: ast.AST, metrics: CodeMetrics) -> List[str]:
-        """Identify potential code issues"""
-        issues = []
-        
-        # Check for common issues
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Try) and not node.handlers:
-                issues.append("Empty try-except block found")
-            elif isinstance(node, ast.Pass):
-                issues.append("Empty code block found")
-                
-        return issues 
\ No newline at end of file
+        return graph 
\ No newline at end of file
@@ -1,11 +1,21 @@
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 import ast
+import asyncio
+import os
 import re
+import tempfile
+import threading
 from dataclasses import dataclass
 from pathlib import Path
 import black
 import isort
-from pylint import epylint
+from pylint.config.config_initialization import _config_initialization
+from pylint.lint import PyLinter
+from pylint.reporters import CollectingReporter
+
+# Pylint message categories reported as warnings; convention and refactor
+# messages are style violations
+PYLINT_WARNING_CATEGORIES = frozenset({'warning', 'error', 'fatal'})
 
 @dataclass
 class ValidationResult:
@@ -19,6 +29,17 @@ class CodeValidator:
     def __init__(self):
         self.black_mode = black.FileMode()
         self.isort_config = isort.Config(profile="black")
+        # Sources larger than this are parsed off the event loop
+        self.parse_in_thread_size = 64 * 1024
+        
+        # One in-process linter reused across calls instead of a pylint subprocess each time
+        self._linter = PyLinter()
+        self._linter.load_default_plugins()
+        self._lint_reporter = CollectingReporter()
+        self._linter.set_reporter(self._lint_reporter)
+        # Same option and rcfile setup pylint's Run does before checking
+        _config_initialization(self._linter, [], self._lint_reporter)
+        self._lint_lock = threading.Lock()  # PyLinter keeps per-run state
         
     async def validate(self, code: str, language: str) -> ValidationResult:
         """Validate code based on language"""
@@ -40,38 +61,43 @@ class CodeValidator:
         
         # Syntax check
         try:
-            ast.parse(code)
+            if len(code) > self.parse_in_thread_size:
+                await asyncio.to_thread(ast.parse, code)
+            else:
+                ast.parse(code)
         except SyntaxError as e:
             errors.append(f"Syntax error: {str(e)}")
             return ValidationResult(False, errors, [], [], [])
             
+        # black, isort and pylint are independent, so run them side by side
+        formatted_code, sorted_code, lint_result = await asyncio.gather(
+            asyncio.to_thread(black.format_str, code, mode=self.black_mode),
+            asyncio.to_thread(isort.code, code, config=self.isort_config),
+            asyncio.to_thread(self._run_pylint, code),
+            return_exceptions=True
+        )
+        
         # Style check with black
-        try:
-            formatted_code = black.format_str(code, mode=self.black_mode)
-            if formatted_code != code:
-                style_violations.append("Code does not match black formatting")
-                suggestions.append("Run black formatter")
-        except Exception as e:
-            warnings.append(f"Black formatting error: {str(e)}")
+        if isinstance(formatted_code, Exception):
+            warnings.append(f"Black formatting error: {str(formatted_code)}")
+        elif formatted_code != code:
+            style_violations.append("Code does not match black formatting")
+            suggestions.append("Run black formatter")
             
         # Import sorting with isort
-        try:
-            sorted_code = isort.code(code, config=self.isort_config)
-            if sorted_code != code:
-                style_violations.append("Imports are not properly sorted")
-                suggestions.append("Run isort")
-        except Exception as e:
-            warnings.append(f"Import sorting error: {str(e)}")
+        if isinstance(sorted_code, Exception):
+            warnings.append(f"Import sorting error: {str(sorted_code)}")
+        elif sorted_code != code:
+            style_violations.append("Imports are not properly sorted")
+            suggestions.append("Run isort")
             
         # Linting with pylint
-        try:
-            (pylint_stdout, pylint_stderr) = epylint.py_run(
-                code, return_std=True
-            )
-            if pylint_stderr:
-                warnings.extend(pylint_stderr.readlines())
-        except Exception as e:
-            warnings.append(f"Linting error: {str(e)}")
+        if isinstance(lint_result, Exception):
+            warnings.append(f"Linting error: {str(lint_result)}")
+        else:
+            lint_warnings, lint_style = lint_result
+            warnings.extend(lint_warnings)
+            style_violations.extend(lint_style)
             
         return ValidationResult(
             is_valid=len(errors) == 0,
@@ -81,6 +107,24 @@ class CodeValidator:
             suggestions=suggestions
         )
         
+    def _run_pylint(self, code: str) -> Tuple[List[str], List[str]]:
+        """Lint code with the shared linter, returning its warnings and style messages"""
+        with tempfile.NamedTemporaryFile('w', suffix='.py', delete=False) as f:
+            f.write(code)
+        try:
+            with self._lint_lock:
+                self._lint_reporter.messages = []
+                self._linter.check([f.name])
+                messages = self._lint_reporter.messages
+        finally:
+            os.unlink(f.name)
+            
+        lint_warnings, lint_style = [], []
+        for m in messages:
+            target = lint_warnings if m.category in PYLINT_WARNING_CATEGORIES else lint_style
+            target.append(f"Line {m.line}: {m.msg} ({m.symbol})")
+        return lint_warnings, lint_style
+        
     async def _validate_typescript(self, code: str) -> ValidationResult:
         """Validate TypeScript code"""
         # Implement TypeScript validation
@@ -42,11 +42,9 @@ class ComponentGenerator:
         extension = self._get_extension(spec.language, spec.framework)
         output_path = self.output_dir / f"{spec.name}{extension}"
         
-        # Write component to file
-        await self._write_component(output_path, code)
-        
-        # Generate additional files (e.g., styles, tests)
+        # Write the component alongside additional files (e.g., styles, tests)
         await asyncio.gather(
+            self._write_component(output_path, code),
             self._generate_styles(spec, output_path),
             self._generate_tests(spec, output_path)
         )
@@ -55,8 +53,7 @@ class ComponentGenerator:
         
     async def _write_component(self, path: Path, content: str) -> None:
         """Write component content to file"""
-        async with asyncio.Lock():
-            path.write_text(content)
+        await asyncio.to_thread(path.write_text, content, encoding="utf-8")
             
     async def _generate_styles(self, spec: ComponentSpec, component_path: Path) -> Optional[Path]:
         """Generate component styles if needed"""
@@ -1,6 +1,7 @@
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Set
 from pathlib import Path
-import json
+import orjson
+import simdjson
 from dataclasses import dataclass, asdict
 import asyncio
 from datetime import datetime
@@ -20,60 +21,117 @@ class ComponentRegistry:
     def __init__(self, registry_path: str = "src/components/registry.json"):
         self.registry_path = Path(registry_path)
         self.components: Dict[str, ComponentMetadata] = {}
+        # Entries of the parsed file not yet turned into ComponentMetadata
+        self._raw: Optional[simdjson.Object] = None
+        self._unloaded: Set[str] = set()
+        
+        # Mutations mark the registry dirty; one write covers everything
+        # changed within flush_delay seconds
+        self.flush_delay = 0.05
+        self._dirty = False
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
         self._load_registry()
         
     def _load_registry(self):
-        """Load component registry from file"""
+        """Load component registry from file.
+        
+        The file is parsed lazily; entries become ComponentMetadata the first
+        time they are looked up, searched for or saved.
+        """
         if self.registry_path.exists():
-            with open(self.registry_path) as f:
-                data = json.load(f)
-                self.components = {
-                    name: ComponentMetadata(**meta)
-                    for name, meta in data.items()
-                }
+            # A parser holds one document at a time, so keep this one to ourselves
+            self._raw = simdjson.Parser().parse(self.registry_path.read_bytes())
+            self._unloaded = set(self._raw.keys())
+            
+    def _materialize(self, name: str) -> Optional[ComponentMetadata]:
+        """Build metadata for a component still in the parsed file"""
+        if name in self._unloaded:
+            self._unloaded.discard(name)
+            self.components[name] = ComponentMetadata(**self._raw[name].as_dict())
+        return self.components.get(name)
+        
+    def _materialize_all(self):
+        for name in list(self._unloaded):
+            self._materialize(name)
+        self._raw = None
                 
-    def _save_registry(self):
-        """Save component registry to file"""
+    def _serialize_registry(self) -> bytes:
+        """Encode the whole registry as it will be saved to file"""
+        self._materialize_all()
+        payload = {name: asdict(meta) for name, meta in self.components.items()}
+        return orjson.dumps(payload, option=orjson.OPT_INDENT_2)
+        
+    def _write_registry(self, data: bytes):
+        """Save encoded registry to file"""
         self.registry_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(self.registry_path, 'w') as f:
-            json.dump(
-                {name: asdict(meta) for name, meta in self.components.items()},
-                f,
-                indent=2
-            )
+        self.registry_path.write_bytes(data)
+        
+    def _schedule_flush(self):
+        """Mark the registry changed and make sure a write is pending"""
+        self._dirty = True
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._debounced_flush())
+            
+    async def _debounced_flush(self):
+        # Keep going while changes arrive during a write, so none are left unsaved
+        while self._dirty:
+            await asyncio.sleep(self.flush_delay)
+            await self.flush()
+        
+    async def flush(self):
+        """Write pending changes to disk now; call before shutting down"""
+        async with self._flush_lock:
+            if not self._dirty:
+                return
+            self._dirty = False
+            # Serialize here so the worker thread never sees a dict being mutated
+            data = self._serialize_registry()
+            await asyncio.to_thread(self._write_registry, data)
             
     async def register_component(self, metadata: ComponentMetadata) -> bool:
         """Register a new component"""
-        if metadata.name in self.components:
+        if metadata.name in self.components or metadata.name in self._unloaded:
             return False
             
         self.components[metadata.name] = metadata
-        self._save_registry()
+        self._schedule_flush()
         return True
         
     async def update_component(self, name: str, updates: Dict[str, Any]) -> bool:
         """Update component metadata"""
-        if name not in self.components:
+        metadata = self._materialize(name)
+        if metadata is None:
             return False
             
-        metadata = self.components[name]
         for key, value in updates.items():
             if hasattr(metadata, key):
                 setattr(metadata, key, value)
                 
         metadata.updated_at = datetime.now().isoformat()
-        self._save_registry()
+        self._schedule_flush()
         return True
         
     async def get_component(self, name: str) -> Optional[ComponentMetadata]:
         """Get component metadata"""
-        return self.components.get(name)
+        return self._materialize(name)
         
     async def search_components(self, 
                               language: Optional[str] = None,
                               framework: Optional[str] = None,
                               tags: Optional[List[str]] = None) -> List[ComponentMetadata]:
         """Search components by criteria"""
+        # Check unloaded entries on the parsed document, building only matches
+        for name in list(self._unloaded):
+            raw = self._raw[name]
+            if language and raw.get("language") != language:
+                continue
+            if framework and raw.get("framework") != framework:
+                continue
+            if tags and not all(tag in raw.get("tags", ()) for tag in tags):
+                continue
+            self._materialize(name)
+            
         results = []
         
         for component in self.components.values():
@@ -92,9 +150,12 @@ class ComponentRegistry:
         
     async def delete_component(self, name: str) -> bool:
         """Delete component from registry"""
-        if name not in self.components:
+        if name in self._unloaded:
+            self._unloaded.discard(name)
+        elif name in self.components:
+            del self.components[name]
+        else:
             return False
             
-        del self.components[name]
-        self._save_registry()
+        self._schedule_flush()
         return True 
\ No newline at end of file
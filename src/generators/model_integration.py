@@ -1,6 +1,8 @@
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Callable
 from dataclasses import dataclass
 import asyncio
+import functools
+import sys
 from pathlib import Path
 
 from ..core.base_models import BaseModel, EdgeTPUModel, CPUModel, ModelConfig
@@ -36,6 +38,7 @@ class ModelIntegration:
             
         # Load generation templates and patterns
         self.patterns = self._load_patterns()
+        self._input_builder = functools.lru_cache(maxsize=64)(self._make_input_builder)
         
     async def generate_code(self, context: GenerationContext) -> List[ModelSuggestion]:
         """Generate code suggestions using the ML model"""
@@ -88,15 +91,32 @@ class ModelIntegration:
             
     async def _prepare_model_input(self, context: GenerationContext) -> Dict[str, Any]:
         """Prepare input for the model"""
-        return {
-            'language': context.language,
-            'framework': context.framework,
-            'component_type': context.component_type,
-            'existing_code': context.existing_code or '',
-            'requirements': context.requirements or {},
-            'constraints': context.constraints or {},
-            'patterns': self.patterns.get(context.language, {})
-        }
+        build = self._input_builder(
+            sys.intern(context.language),
+            sys.intern(context.framework),
+            sys.intern(context.component_type)
+        )
+        return build(context)
+        
+    def _make_input_builder(self, 
+                          language: str, 
+                          framework: str, 
+                          component_type: str) -> Callable[[GenerationContext], Dict[str, Any]]:
+        """Create an input builder with one combination's fixed fields baked in"""
+        patterns = self.patterns.get(language, {})
+        
+        def build(context: GenerationContext) -> Dict[str, Any]:
+            return {
+                'language': language,
+                'framework': framework,
+                'component_type': component_type,
+                'existing_code': context.existing_code or '',
+                'requirements': context.requirements or {},
+                'constraints': context.constraints or {},
+                'patterns': patterns
+            }
+            
+        return build
         
     async def _process_predictions(self, 
                                  predictions: Any, 
@@ -1,10 +1,27 @@
 import asyncio
+import array
+import fnmatch
+import threading
 import time
-from typing import Dict, Any, List
+from collections import deque
+from typing import Deque, Dict, Any, List, Optional, Tuple
 import psutil
 import numpy as np
 from dataclasses import dataclass
 
+# Small integer ids for metric names recorded through RingMetrics
+_metric_ids: Dict[str, int] = {}
+_metric_names: List[str] = []
+_metric_ids_lock = threading.Lock()
+
+def register_metric(name: str) -> int:
+    """Get the id for a metric name, registering it on first use"""
+    with _metric_ids_lock:
+        if name not in _metric_ids:
+            _metric_ids[name] = len(_metric_names)
+            _metric_names.append(name)
+        return _metric_ids[name]
+
 @dataclass
 class SystemMetrics:
     cpu_percent: float
@@ -74,6 +91,22 @@ class MetricsTracker:
         if alerts:
             await self._notify_subscribers(alerts)
             
+    def record(self, name: str, value: Any):
+        """Record a metric sample"""
+        self.metrics.setdefault(name, []).append(value)
+        
+    def record_error(self, error_type: str, message: str):
+        """Record an error occurrence"""
+        self.metrics.setdefault('errors', []).append({
+            'type': error_type,
+            'message': message,
+            'timestamp': time.time()
+        })
+        
+    def time(self) -> float:
+        """Get a monotonic timestamp for measuring durations"""
+        return time.perf_counter()
+        
     def subscribe(self, callback):
         """Subscribe to metric alerts"""
         self._subscribers.append(callback)
@@ -99,4 +132,179 @@ class MetricsTracker:
     def _get_power_usage(self) -> float:
         """Get system power usage"""
         # Implement based on your hardware
-        return 0.0  # Placeholder 
\ No newline at end of file
+        return 0.0  # Placeholder 
+
+class _RingBuffer:
+    """Single-writer ring of (metric id, value) samples"""
+    
+    def __init__(self, size: int):
+        self.keys = array.array('i', [0] * size)
+        self.values = array.array('d', [0.0] * size)
+        self.write_idx = 0
+        self.read_idx = 0
+
+class RingMetrics:
+    """Lock-free recording of numeric samples, drained into a MetricsTracker.
+    
+    Each thread writes to its own ring buffer, so record() takes no lock. A
+    background task drains the buffers every flush_interval seconds; if a
+    thread laps the drain, the oldest unflushed samples are overwritten.
+    """
+    
+    SIZE = 8192
+    
+    def __init__(self, tracker: MetricsTracker, flush_interval: float = 1.0):
+        self.tracker = tracker
+        self.flush_interval = flush_interval
+        self._local = threading.local()
+        self._buffers: List[_RingBuffer] = []
+        self._buffers_lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        
+    def record(self, key_id: int, value: float):
+        """Record a sample for a metric id from register_metric"""
+        buffer = getattr(self._local, 'buffer', None)
+        if buffer is None:
+            buffer = self._register_buffer()
+            
+        idx = buffer.write_idx
+        buffer.keys[idx] = key_id
+        buffer.values[idx] = value
+        buffer.write_idx = (idx + 1) & (self.SIZE - 1)
+        
+        if self._task is None:
+            self._start_flushing()
+            
+    def flush(self):
+        """Move all buffered samples into the tracker"""
+        with self._buffers_lock:
+            buffers = list(self._buffers)
+            
+        for buffer in buffers:
+            end = buffer.write_idx
+            idx = buffer.read_idx
+            while idx != end:
+                self.tracker.record(_metric_names[buffer.keys[idx]], buffer.values[idx])
+                idx = (idx + 1) & (self.SIZE - 1)
+            buffer.read_idx = end
+            
+    async def stop(self):
+        """Stop the background drain and flush what is left"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.flush()
+        
+    def _register_buffer(self) -> _RingBuffer:
+        buffer = _RingBuffer(self.SIZE)
+        self._local.buffer = buffer
+        with self._buffers_lock:
+            self._buffers.append(buffer)
+        return buffer
+        
+    def _start_flushing(self):
+        try:
+            self._task = asyncio.get_running_loop().create_task(self._flush_loop())
+        except RuntimeError:
+            pass  # No event loop in this thread; samples wait for one that has it
+            
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            self.flush()
+
+class MetricsCollector:
+    """Named metric samples and counters for the serving components.
+    
+    record_nowait() only appends to a buffer, so hot paths never await; a
+    background task moves buffered samples into per-name histories every
+    flush_interval seconds.
+    """
+    
+    def __init__(self, flush_interval: float = 0.1, history: int = 1000):
+        self.flush_interval = flush_interval
+        self.history = history
+        self._buffer: Deque[Tuple[float, str, Any]] = deque()
+        self._samples: Dict[str, Deque[Tuple[float, Any]]] = {}
+        self._counters: Dict[str, float] = {}
+        self._task: Optional[asyncio.Task] = None
+        
+    def record_nowait(self, name: str, value: Any):
+        """Buffer a sample without suspending the caller"""
+        self._buffer.append((time.time(), name, value))
+        if self._task is None:
+            self._start_flushing()
+            
+    async def record_metrics(self, name: str, values: Dict[str, Any]):
+        """Record a group of related values as one sample"""
+        self.record_nowait(name, values)
+        
+    async def record_metric(self, name: str, value: Any, tags: Optional[Dict[str, Any]] = None):
+        """Record a single value, optionally tagged"""
+        self.record_nowait(name, {"value": value, **tags} if tags else value)
+        
+    async def increment(self, name: str, amount: float = 1):
+        """Increase a counter"""
+        self._counters[name] = self._counters.get(name, 0) + amount
+        
+    async def decrement(self, name: str, amount: float = 1):
+        """Decrease a counter"""
+        self._counters[name] = self._counters.get(name, 0) - amount
+        
+    async def get_rate(self, numerator: str, other: str) -> float:
+        """Share of numerator among numerator + other, e.g. hits vs misses"""
+        hits = self._counters.get(numerator, 0)
+        total = hits + self._counters.get(other, 0)
+        return hits / total if total else 0.0
+        
+    async def get_metrics(self, pattern: str = "*") -> Dict[str, Any]:
+        """Counters and recent samples whose names match a glob pattern"""
+        self.flush()
+        metrics: Dict[str, Any] = {
+            name: value for name, value in self._counters.items()
+            if fnmatch.fnmatchcase(name, pattern)
+        }
+        for name, samples in self._samples.items():
+            if fnmatch.fnmatchcase(name, pattern):
+                metrics[name] = [value for _, value in samples]
+        return metrics
+        
+    async def get_all_metrics(self) -> Dict[str, Any]:
+        """All counters and recent samples"""
+        return await self.get_metrics()
+        
+    def flush(self):
+        """Move buffered samples into their histories"""
+        buffer = self._buffer
+        for _ in range(len(buffer)):
+            timestamp, name, value = buffer.popleft()
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=self.history)
+            samples.append((timestamp, value))
+            
+    async def stop(self):
+        """Stop the background flush and drain what is left"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.flush()
+        
+    def _start_flushing(self):
+        try:
+            self._task = asyncio.get_running_loop().create_task(self._flush_loop())
+        except RuntimeError:
+            pass  # No running loop; samples are flushed on the next read
+            
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            self.flush()
@@ -0,0 +1,30 @@
+import pytest
+
+from src.generators.code_validator import CodeValidator
+
+@pytest.fixture
+def validator():
+    return CodeValidator()
+
+class TestCodeValidator:
+    def test_pylint_messages_split_by_category(self, validator):
+        code = 'import os\n\n\ndef f():\n    return undefined_name\n'
+        
+        warnings, style = validator._run_pylint(code)
+        
+        assert any('(undefined-variable)' in message for message in warnings)
+        assert any('(unused-import)' in message for message in warnings)
+        assert not any('docstring' in message for message in warnings)
+        assert any('(missing-function-docstring)' in message for message in style)
+        
+    @pytest.mark.asyncio
+    async def test_validate_python_routes_lint_messages(self, validator):
+        code = '"""Module."""\n\n\ndef f():\n    """Return a value."""\n    return undefined_name\n'
+        
+        result = await validator.validate(code, 'python')
+        
+        assert result.is_valid
+        assert [m for m in result.warnings if 'undefined-variable' in m] == [
+            "Line 6: Undefined variable 'undefined_name' (undefined-variable)"
+        ]
+        assert not any('Linting error' in m for m in result.warnings)
@@ -351,4 +351,19 @@ class TestConflictResolver:
         )
         
         conflict = await resolver.check_conflict(op2, [op1])
-        assert conflict is None 
\ No newline at end of file
+        assert conflict is None         
+    def test_merge_changes_combines_disjoint_edits(self, resolver):
+        base = 'a = 1\nb = 2\nc = 3\n'
+        
+        merged = resolver._merge_changes(base, [
+            'a = 10\nb = 2\nc = 3\n',
+            'a = 1\nb = 2\nc = 30\n'
+        ])
+        
+        assert merged == 'a = 10\nb = 2\nc = 30\n'
+        
+    def test_merge_changes_conflicting_edits(self, resolver):
+        base = 'value = 1\n'
+        
+        # Both changes rewrite the same text, so the second hunk cannot apply
+        assert resolver._merge_changes(base, ['value = 2\n', 'value = 3\n']) is None
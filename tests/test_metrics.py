@@ -1,6 +1,6 @@
 import pytest
 import asyncio
-from src.monitoring.metrics import MetricsTracker, SystemMetrics
+from src.monitoring.metrics import MetricsTracker, SystemMetrics, RingMetrics, MetricsCollector, register_metric
 
 @pytest.fixture
 def metrics_tracker():
@@ -48,4 +48,37 @@ class TestMetricsTracker:
         metrics_tracker.metrics['preview_latency'].append(0.5)
         
         assert len(metrics_tracker.metrics['model_load_time']) == 1
-        assert len(metrics_tracker.metrics['preview_latency']) == 1 
\ No newline at end of file
+        assert len(metrics_tracker.metrics['preview_latency']) == 1 
+        
+    @pytest.mark.asyncio
+    async def test_ring_metrics_flush(self, metrics_tracker):
+        ring = RingMetrics(metrics_tracker, flush_interval=60)
+        latency = register_metric('preview_latency')
+        
+        for value in (0.1, 0.2, 0.3):
+            ring.record(latency, value)
+            
+        assert metrics_tracker.metrics['preview_latency'] == []
+        
+        await ring.stop()
+        
+        assert metrics_tracker.metrics['preview_latency'] == pytest.approx([0.1, 0.2, 0.3])
+
+class TestMetricsCollector:
+    @pytest.mark.asyncio
+    async def test_record_nowait_batches_until_flush(self):
+        collector = MetricsCollector(flush_interval=60)
+        
+        collector.record_nowait("query_performance", {"execution_time": 0.2})
+        collector.record_nowait("query_performance", {"execution_time": 0.4})
+        await collector.increment("cache.hits", 3)
+        await collector.increment("cache.misses")
+        
+        assert collector._samples == {}
+        
+        await collector.stop()
+        
+        assert await collector.get_metrics("query_*") == {
+            "query_performance": [{"execution_time": 0.2}, {"execution_time": 0.4}]
+        }
+        assert await collector.get_rate("cache.hits", "cache.misses") == 0.75
@@ -0,0 +1,52 @@
+import pytest
+import sqlalchemy as sa
+
+from src.database.schema_manager import DatabaseManager, Operation, ConflictOperation
+
+@pytest.fixture
+def db_manager():
+    return DatabaseManager('sqlite+aiosqlite:///:memory:')
+
+def make_rows(count: int, path: str = 'test/file.py'):
+    return [
+        dict(
+            type='insert',
+            path=path,
+            user_id='user1',
+            content=f'line {i}',
+            position=i,
+            version=i
+        )
+        for i in range(count)
+    ]
+
+class TestDatabaseManager:
+    @pytest.mark.asyncio
+    async def test_record_operations_bulk(self, db_manager):
+        await db_manager.init_db()
+        await db_manager.record_operations_bulk(make_rows(3))
+        
+        operations = await db_manager.get_file_operations('test/file.py')
+        assert sorted(op.content for op in operations) == ['line 0', 'line 1', 'line 2']
+        
+    @pytest.mark.asyncio
+    async def test_record_operations_bulk_empty(self, db_manager):
+        await db_manager.init_db()
+        await db_manager.record_operations_bulk([])
+        
+        assert await db_manager.get_user_operations('user1') == []
+        
+    @pytest.mark.asyncio
+    async def test_record_conflict_links_operations(self, db_manager):
+        await db_manager.init_db()
+        await db_manager.record_operations_bulk(make_rows(2))
+        
+        conflict = await db_manager.record_conflict('test/file.py', [1, 2])
+        
+        async with db_manager.SessionLocal() as session:
+            linked = (await session.execute(
+                sa.select(ConflictOperation.operation_id)
+                .where(ConflictOperation.conflict_id == conflict.id)
+            )).scalars().all()
+        assert sorted(linked) == [1, 2]
+        assert [c.id for c in await db_manager.get_unresolved_conflicts()] == [conflict.id]
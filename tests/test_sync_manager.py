@@ -3,11 +3,15 @@ import asyncio
 from datetime import datetime
 from pathlib import Path
 
+import git
+
 from src.collaboration.sync_manager import SyncManager, SyncOperation, SyncState
 
 @pytest.fixture
-def sync_manager():
-    return SyncManager()
+def sync_manager(tmp_path):
+    repo_path = tmp_path / 'repo'
+    git.Repo.init(repo_path)
+    return SyncManager(str(repo_path), 'sqlite+aiosqlite:///:memory:')
 
 @pytest.fixture
 def test_operation():
@@ -97,4 +101,75 @@ class TestSyncManager:
         test_operation.operation_type = 'modify'
         await sync_manager.acquire_lock(test_operation.path, 'other_user')
         with pytest.raises(PermissionError):
-            await sync_manager.push_operation(test_operation) 
\ No newline at end of file
+            await sync_manager.push_operation(test_operation)         
+    @pytest.mark.asyncio
+    async def test_conflict_candidates_follow_shifted_insert(self, sync_manager, tmp_path):
+        test_file = tmp_path / "file.py"
+        test_file.write_text("original content")
+        path = str(test_file)
+        
+        await sync_manager.start()
+        # Resolved operations are pushed as the system user
+        for user in ('user1', 'user2', 'user3', 'system'):
+            await sync_manager.connect_user(user)
+        queue = await sync_manager.subscribe('user3', path)
+        
+        def insert(user_id, content, position):
+            return SyncOperation(
+                operation_type='insert',
+                path=path,
+                content=content,
+                position=position,
+                user_id=user_id,
+                timestamp=datetime.now().timestamp(),
+                version=-1
+            )
+            
+        first = insert('user1', 'aa', 10)
+        await sync_manager.push_operation(first)
+        await asyncio.wait_for(queue.get(), timeout=1.0)
+        
+        # Resolving the conflicting insert moves the first one
+        await sync_manager.push_operation(insert('user2', 'bb', 10))
+        await asyncio.wait_for(queue.get(), timeout=1.0)
+        assert first.position != 10
+        
+        # Found at its new position, outside the window around the old one
+        candidates = sync_manager._conflict_candidates(insert('user3', 'c', first.position + 1))
+        assert first in candidates
+        
+        await sync_manager.stop()
+        
+    @pytest.mark.asyncio
+    async def test_buffered_operations_flushed(self, sync_manager, test_operation, tmp_path):
+        test_file = tmp_path / "file.py"
+        test_file.write_text("original content")
+        test_operation.path = str(test_file)
+        
+        await sync_manager.start()
+        await sync_manager.connect_user('test_user')
+        
+        # Fail the first insert; its rows must be kept for the next flush
+        record_operations_bulk = sync_manager.db_manager.record_operations_bulk
+        calls = []
+        
+        async def flaky_bulk(rows):
+            calls.append(len(rows))
+            if len(calls) == 1:
+                raise RuntimeError("database unavailable")
+            await record_operations_bulk(rows)
+            
+        sync_manager.db_manager.record_operations_bulk = flaky_bulk
+        
+        await sync_manager.push_operation(test_operation)
+        for _ in range(100):
+            if len(calls) > 1:
+                break
+            await asyncio.sleep(sync_manager.db_flush_interval)
+            
+        assert calls[:2] == [1, 1]
+        assert not sync_manager._db_flush_buffer
+        operations = await sync_manager.db_manager.get_file_operations(test_operation.path)
+        assert [op.type for op in operations] == ['modify']
+        
+        await sync_manager.stop()
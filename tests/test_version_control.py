@@ -0,0 +1,59 @@
+import pytest
+import asyncio
+from pathlib import Path
+
+import git
+
+from src.collaboration.version_control import VersionControlManager
+
+@pytest.fixture
+def repo_path(tmp_path):
+    repo = git.Repo.init(tmp_path / 'repo')
+    with repo.config_writer() as config:
+        config.set_value('user', 'name', 'Test User')
+        config.set_value('user', 'email', 'test@example.com')
+    for name in ('a.py', 'b.py'):
+        (Path(repo.working_dir) / name).write_text(f'# {name}\n')
+    repo.index.add(['a.py', 'b.py'])
+    repo.index.commit('Initial commit')
+    return repo.working_dir
+
+class TestVersionControlManager:
+    @pytest.mark.asyncio
+    async def test_history_saves_are_debounced(self, repo_path):
+        manager = VersionControlManager(repo_path)
+        manager.history_save_delay = 0.05
+        writes = []
+        save_history_cache = manager._save_history_cache
+        
+        def counting_save(items):
+            writes.append(len(items))
+            save_history_cache(items)
+            
+        manager._save_history_cache = counting_save
+        
+        # Histories computed within the delay share one write
+        await manager.get_file_history('a.py')
+        await manager.get_file_history('b.py')
+        assert writes == []
+        
+        await manager._hist_save_task
+        assert writes == [2]
+        
+        # A new manager starts from the saved histories
+        restored = VersionControlManager(repo_path)
+        assert list(restored._hist_cache) == list(manager._hist_cache)
+        
+    @pytest.mark.asyncio
+    async def test_flush_history_cache_writes_pending(self, repo_path):
+        manager = VersionControlManager(repo_path)
+        manager.history_save_delay = 60
+        
+        history = await manager.get_file_history('a.py')
+        assert history
+        await manager.flush_history_cache()
+        
+        restored = VersionControlManager(repo_path)
+        cached = restored._hist_cache[(str(Path('a.py')), restored.repo.head.commit.hexsha, 10)]
+        assert [commit.hash for commit in cached] == [commit.hash for commit in history]
+        manager._hist_save_task.cancel()